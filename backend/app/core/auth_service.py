@@ -4,14 +4,19 @@ import asyncio
 import base64
 import hashlib
 import hmac
-import json
+import os
 import secrets
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 PBKDF2_ITERATIONS = 390000
 MIN_PASSWORD_LENGTH = 6
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 30
 
 
 def _b64_url_encode(data: bytes) -> str:
@@ -23,6 +28,10 @@ def _b64_url_decode(data: str) -> bytes:
     return base64.urlsafe_b64decode((data + padding).encode("ascii"))
 
 
+def _pbkdf2(password: bytes, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password, salt, iterations)
+
+
 def extract_bearer_token(raw_authorization: str | None) -> str | None:
     if not raw_authorization:
         return None
@@ -33,6 +42,16 @@ def extract_bearer_token(raw_authorization: str | None) -> str | None:
     return parts[1].strip() or None
 
 
+def extract_bearer_bytes(headers: list[tuple[bytes, bytes]]) -> str | None:
+    """直接从 ASGI scope 的原始请求头中提取 Bearer token。"""
+    for name, value in headers:
+        if name == b"authorization":
+            if value[:7].lower() != b"bearer ":
+                return None
+            return value[7:].strip().decode("latin-1") or None
+    return None
+
+
 class AuthService:
     def __init__(
         self,
@@ -45,8 +64,16 @@ class AuthService:
         self._lock = asyncio.Lock()
         self._password_hash: str | None = None
         self._salt: str | None = None
+        self._salt_bytes: bytes | None = None
+        # 最近一次验证成功的 (sha256(password + salt), 派生哈希)，重复登录时跳过 PBKDF2
+        self._last_ok_password_hash: tuple[bytes, str] | None = None
         self._iterations = PBKDF2_ITERATIONS
+        # 由密码哈希派生的签名材料，密码变更时统一刷新
+        self._hmac_template: hmac.HMAC | None = None
+        self._version_tag: bytes | None = None
         self._bootstrap_password = (bootstrap_password or "").strip()
+        # 已验证 token 的短期缓存：sha256(token)[:16] -> 缓存失效的 monotonic 时间
+        self._token_cache: OrderedDict[bytes, float] = OrderedDict()
 
     async def ensure(self) -> None:
         async with self._lock:
@@ -60,11 +87,22 @@ class AuthService:
         normalized = password.strip()
         self._validate_password(normalized)
 
+        async with self._lock:
+            if self._password_hash is not None:
+                raise ValueError("访问密码已设置，请直接登录")
+            iterations = self._iterations
+
+        # PBKDF2 耗时较长，在锁外的工作线程中计算，避免阻塞 token 校验
+        salt_bytes = secrets.token_bytes(16)
+        password_hash = (
+            await asyncio.to_thread(_pbkdf2, normalized.encode("utf-8"), salt_bytes, iterations)
+        ).hex()
+
         async with self._lock:
             if self._password_hash is not None:
                 raise ValueError("访问密码已设置，请直接登录")
 
-            await asyncio.to_thread(self._sync_set_password, normalized)
+            await asyncio.to_thread(self._sync_store_password, password_hash, salt_bytes)
             return self._issue_token_locked()
 
     async def login(self, password: str) -> str:
@@ -72,21 +110,62 @@ class AuthService:
         if not normalized:
             raise ValueError("密码不能为空")
 
+        password_bytes = normalized.encode("utf-8")
         async with self._lock:
-            if self._password_hash is None:
+            if self._password_hash is None or self._salt_bytes is None:
                 raise ValueError("请先设置访问密码")
-            if not self._verify_password_locked(normalized):
+
+            probe = hashlib.sha256(password_bytes + self._salt_bytes).digest()
+            cached = self._last_ok_password_hash
+            if cached is not None and hmac.compare_digest(cached[0], probe):
+                return self._issue_token_locked()
+
+            salt_bytes = self._salt_bytes
+            iterations = self._iterations
+            expected_hash = self._password_hash
+
+        # 锁外计算 PBKDF2，完成后重新加锁比对，期间密码若被修改则视为失败
+        candidate_hash = (
+            await asyncio.to_thread(_pbkdf2, password_bytes, salt_bytes, iterations)
+        ).hex()
+
+        async with self._lock:
+            if self._password_hash != expected_hash or not hmac.compare_digest(
+                candidate_hash, expected_hash
+            ):
                 raise PermissionError("密码错误")
+            self._last_ok_password_hash = (probe, candidate_hash)
             return self._issue_token_locked()
 
-    async def verify_token(self, token: str | None) -> bool:
+    async def verify_token(self, token: str | None, now: int | None = None) -> bool:
+        """now 为调用方取得的 Unix 时间戳，未传入时自行读取。"""
         if not token:
             return False
 
+        cache_key = hashlib.sha256(token.encode("utf-8")).digest()[:16]
+        cached_until = self._token_cache.get(cache_key)
+        if cached_until is not None:
+            if cached_until > time.monotonic():
+                self._token_cache.move_to_end(cache_key)
+                return True
+            self._token_cache.pop(cache_key, None)
+
         async with self._lock:
             if self._password_hash is None:
                 return False
-            return self._verify_token_locked(token)
+            if now is None:
+                now = int(time.time())
+            expires_at = self._verify_token_locked(token, now)
+            if expires_at is None:
+                return False
+
+            # 缓存时长不超过 token 剩余有效期，避免延长过期时间
+            ttl = min(TOKEN_CACHE_TTL_SECONDS, expires_at - now)
+            if ttl > 0:
+                self._token_cache[cache_key] = time.monotonic() + ttl
+                if len(self._token_cache) > TOKEN_CACHE_MAX_SIZE:
+                    self._token_cache.popitem(last=False)
+            return True
 
     @staticmethod
     def _validate_password(password: str) -> None:
@@ -94,6 +173,8 @@ class AuthService:
             raise ValueError(f"密码长度不能少于 {MIN_PASSWORD_LENGTH} 位")
 
     def _sync_ensure_and_load(self) -> None:
+        self._token_cache.clear()
+        self._last_ok_password_hash = None
         self._path.parent.mkdir(parents=True, exist_ok=True)
         if not self._path.exists():
             if self._bootstrap_password:
@@ -102,10 +183,12 @@ class AuthService:
                 return
             self._password_hash = None
             self._salt = None
+            self._salt_bytes = None
+            self._refresh_signing_material()
             self._iterations = PBKDF2_ITERATIONS
             return
 
-        raw = json.loads(self._path.read_text(encoding="utf-8"))
+        raw = orjson.loads(self._path.read_bytes())
         password_hash = str(raw.get("password_hash", "")).strip().lower()
         salt = str(raw.get("salt", "")).strip().lower()
         iterations = int(raw.get("iterations", PBKDF2_ITERATIONS))
@@ -113,23 +196,24 @@ class AuthService:
         if not password_hash or not salt:
             self._password_hash = None
             self._salt = None
+            self._salt_bytes = None
+            self._refresh_signing_material()
             self._iterations = PBKDF2_ITERATIONS
             return
 
         self._password_hash = password_hash
         self._salt = salt
+        self._salt_bytes = bytes.fromhex(salt)
+        self._refresh_signing_material()
         self._iterations = max(100_000, iterations)
 
     def _sync_set_password(self, password: str) -> None:
         salt_bytes = secrets.token_bytes(16)
-        salt_hex = salt_bytes.hex()
-        password_hash = hashlib.pbkdf2_hmac(
-            "sha256",
-            password.encode("utf-8"),
-            salt_bytes,
-            self._iterations,
-        ).hex()
+        password_hash = _pbkdf2(password.encode("utf-8"), salt_bytes, self._iterations).hex()
+        self._sync_store_password(password_hash, salt_bytes)
 
+    def _sync_store_password(self, password_hash: str, salt_bytes: bytes) -> None:
+        salt_hex = salt_bytes.hex()
         payload: dict[str, Any] = {
             "salt": salt_hex,
             "password_hash": password_hash,
@@ -137,23 +221,15 @@ class AuthService:
             "updated_at": int(time.time()),
         }
         temp_path = self._path.with_suffix(".tmp")
-        temp_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-        temp_path.replace(self._path)
+        temp_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+        os.replace(temp_path, self._path)
 
         self._password_hash = password_hash
         self._salt = salt_hex
-
-    def _verify_password_locked(self, password: str) -> bool:
-        if self._password_hash is None or self._salt is None:
-            return False
-
-        candidate_hash = hashlib.pbkdf2_hmac(
-            "sha256",
-            password.encode("utf-8"),
-            bytes.fromhex(self._salt),
-            self._iterations,
-        ).hex()
-        return hmac.compare_digest(candidate_hash, self._password_hash)
+        self._salt_bytes = salt_bytes
+        self._refresh_signing_material()
+        self._last_ok_password_hash = None
+        self._token_cache.clear()
 
     def _issue_token_locked(self) -> str:
         if self._password_hash is None:
@@ -163,51 +239,65 @@ class AuthService:
             "exp": int(time.time()) + self._token_ttl_seconds,
             "v": self._password_hash[:16],
         }
-        payload_encoded = _b64_url_encode(
-            json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
-        )
+        payload_encoded = _b64_url_encode(orjson.dumps(payload))
         signature = _b64_url_encode(self._sign_payload(payload_encoded))
         return f"{payload_encoded}.{signature}"
 
-    def _verify_token_locked(self, token: str) -> bool:
+    def _verify_token_locked(self, token: str, now: int | None = None) -> int | None:
+        """校验 token，有效时返回其过期时间戳，否则返回 None。"""
         if self._password_hash is None:
-            return False
+            return None
 
         parts = token.split(".", 1)
         if len(parts) != 2:
-            return False
+            return None
 
         payload_encoded, signature_encoded = parts
         if not payload_encoded or not signature_encoded:
-            return False
+            return None
 
         try:
             signature = _b64_url_decode(signature_encoded)
         except Exception:
-            return False
+            return None
 
         expected_signature = self._sign_payload(payload_encoded)
         if not hmac.compare_digest(signature, expected_signature):
-            return False
+            return None
 
         try:
-            payload = json.loads(_b64_url_decode(payload_encoded).decode("utf-8"))
+            payload = orjson.loads(_b64_url_decode(payload_encoded))
         except Exception:
-            return False
-
-        try:
-            expires_at = int(payload.get("exp", 0))
-        except (TypeError, ValueError):
-            return False
-
-        if expires_at <= int(time.time()):
-            return False
-
-        version = str(payload.get("v", ""))
-        return hmac.compare_digest(version, self._password_hash[:16])
+            return None
+
+        if not isinstance(payload, dict):
+            return None
+
+        # token 由本服务签发，exp 必为整数、v 必为字符串，类型不符直接视为无效
+        expires_at = payload.get("exp")
+        if now is None:
+            now = int(time.time())
+        if type(expires_at) is not int or expires_at <= now:
+            return None
+
+        version = payload.get("v")
+        if not isinstance(version, str) or self._version_tag is None:
+            return None
+        if not hmac.compare_digest(version.encode("utf-8"), self._version_tag):
+            return None
+        return expires_at
+
+    def _refresh_signing_material(self) -> None:
+        if self._password_hash is None:
+            self._hmac_template = None
+            self._version_tag = None
+            return
+        self._hmac_template = hmac.new(bytes.fromhex(self._password_hash), None, hashlib.sha256)
+        self._version_tag = self._password_hash[:16].encode("ascii")
 
     def _sign_payload(self, payload_encoded: str) -> bytes:
-        if self._password_hash is None:
+        if self._hmac_template is None:
             raise RuntimeError("password hash missing")
-        secret = bytes.fromhex(self._password_hash)
-        return hmac.new(secret, payload_encoded.encode("utf-8"), hashlib.sha256).digest()
+        mac = self._hmac_template.copy()
+        mac.update(payload_encoded.encode("utf-8"))
+        return mac.digest()
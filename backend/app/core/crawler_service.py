@@ -3,23 +3,89 @@ from __future__ import annotations
 import asyncio
 import contextvars
 import datetime as dt_mod
+import hashlib
 import logging
 import logging.handlers
 import os
 import re
+import selectors
 import subprocess
+import tempfile
+import time
 from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections.abc import Awaitable, Callable
+from functools import lru_cache
 from pathlib import Path
 from time import perf_counter
 from typing import Any
 
 _TZ_CN = dt_mod.timezone(dt_mod.timedelta(hours=8))
+_TZ_CN_OFFSET_SECONDS = 8 * 60 * 60
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _fmt_time(timestamp: int) -> str:
+    """按 +08:00 格式化为文件名中的时间串，等价于 strftime("%Y-%m-%d %H-%M-%S")。"""
+    lt = time.gmtime(timestamp + _TZ_CN_OFFSET_SECONDS)
+    return (
+        f"{lt.tm_year:04d}-{lt.tm_mon:02d}-{lt.tm_mday:02d} "
+        f"{lt.tm_hour:02d}-{lt.tm_min:02d}-{lt.tm_sec:02d}"
+    )
+
+
+def _parse_fmt_time(value: str) -> float:
+    """解析 "%Y-%m-%d %H-%M-%S"（+08:00）；格式固定时按下标直接取值，避免 strptime。"""
+    if (
+        len(value) == 19
+        and value[4] == "-"
+        and value[7] == "-"
+        and value[10] == " "
+        and value[13] == "-"
+        and value[16] == "-"
+    ):
+        try:
+            return dt_mod.datetime(
+                int(value[0:4]),
+                int(value[5:7]),
+                int(value[8:10]),
+                int(value[11:13]),
+                int(value[14:16]),
+                int(value[17:19]),
+                tzinfo=_TZ_CN,
+            ).timestamp()
+        except ValueError:
+            pass
+    naive = dt_mod.datetime.strptime(value, "%Y-%m-%d %H-%M-%S")
+    return naive.replace(tzinfo=_TZ_CN).timestamp()
+
+
+def _parse_ct(create_time: Any) -> float | None:
+    try:
+        if isinstance(create_time, str):
+            if "-" in create_time and " " in create_time:
+                # f2 用 +08:00 时区格式化，解析时也按 +08:00 还原
+                timestamp = _parse_fmt_time(create_time)
+            else:
+                timestamp = float(create_time)
+        else:
+            timestamp = float(create_time)
+
+        if timestamp > 1e10:
+            timestamp /= 1000
+        return timestamp
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_ct_cached(create_time: str | float | int) -> float | None:
+    """同一 create_time 会在多页、重试与多处调用中反复出现，缓存解析结果。"""
+    return _parse_ct(create_time)
+
+
 def _setup_exif_logger() -> logging.Logger:
     """创建写入文件的 EXIF 专用 logger，用于事后排查。"""
     exif_logger = logging.getLogger("exif_update")
@@ -65,6 +131,17 @@ CURRENT_LOG_STREAM_ID: contextvars.ContextVar[str | None] = contextvars.ContextV
 )
 
 
+class LogStreamFilter(logging.Filter):
+    """只放行当前上下文属于指定日志流的记录；在 Handler.handle 加锁之前生效。"""
+
+    def __init__(self, stream_id: str) -> None:
+        super().__init__()
+        self._stream_id = stream_id
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return CURRENT_LOG_STREAM_ID.get() == self._stream_id
+
+
 class EmitBridgeLogHandler(logging.Handler):
     """Bridge f2 logger records into websocket task events."""
 
@@ -72,38 +149,335 @@ class EmitBridgeLogHandler(logging.Handler):
         self,
         loop: asyncio.AbstractEventLoop,
         emit: EventEmitter,
-        stream_id: str | None,
     ) -> None:
         super().__init__(level=logging.INFO)
         self._loop = loop
         self._emit = emit
-        self._stream_id = stream_id
         self.setFormatter(logging.Formatter("%(message)s"))
 
     def emit(self, record: logging.LogRecord) -> None:
-        if self._stream_id and CURRENT_LOG_STREAM_ID.get() != self._stream_id:
+        # 日志线程里只取原始字段，strip 与事件构造放到事件循环中执行；
+        # 带异常或调用栈的记录仍完整格式化，保留 traceback
+        if record.exc_info or record.exc_text or record.stack_info:
+            message = self.format(record)
+        else:
+            message = record.getMessage()
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._forward(record.levelname.lower(), record.name, message),
+                self._loop,
+            )
+        except RuntimeError:
             return
 
-        message = self.format(record).strip()
+    async def _forward(self, level: str, logger_name: str, message: str) -> None:
+        message = message.strip()
         if not message:
             return
+        await self._emit("crawler_log", message, {"level": level, "logger": logger_name})
+
+
+class EventCoalescer:
+    """合并单个用户下载过程中的 item_skipped 事件：缓冲 100ms 或满 64 条后下发。
+
+    多条合并为一条 item_skipped_batch 事件，data 为
+    {"version": 1, "sec_user_id": ..., "count": n, "events": [...]}；只有一条时仍按原样下发。
+    其余事件不入队，先下发已缓冲的跳过事件再直接发送，保持同一用户内的事件顺序。
+    """
+
+    FLUSH_INTERVAL_SECONDS = 0.1
+    MAX_BATCH_EVENTS = 64
+    COALESCE_EVENT_TYPE = "item_skipped"
+    BATCH_EVENT_TYPE = "item_skipped_batch"
+    BATCH_EVENT_VERSION = 1
+
+    def __init__(self, emit: EventEmitter, sec_user_id: str) -> None:
+        self._emit = emit
+        self._sec_user_id = sec_user_id
+        self._pending: list[tuple[str, dict[str, Any]]] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task[None] | None = None
+
+    async def emit(self, event_type: str, message: str, data: dict[str, Any]) -> None:
+        async with self._lock:
+            if event_type != self.COALESCE_EVENT_TYPE:
+                await self._flush_locked()
+                await self._emit(event_type, message, data)
+                return
+
+            self._pending.append((message, data))
+            if len(self._pending) >= self.MAX_BATCH_EVENTS:
+                await self._flush_locked()
+            elif self._timer is None:
+                self._timer = asyncio.create_task(
+                    self._flush_later(), name="crawler-event-coalescer"
+                )
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.FLUSH_INTERVAL_SECONDS)
+        async with self._lock:
+            self._timer = None
+            try:
+                await self._flush_locked()
+            except Exception:
+                logger.exception("failed to dispatch coalesced crawler events")
+
+    async def _flush_locked(self) -> None:
+        timer = self._timer
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+            self._timer = None
+
+        pending = self._pending
+        if not pending:
+            return
+        self._pending = []
+
+        if len(pending) == 1:
+            message, data = pending[0]
+            await self._emit(self.COALESCE_EVENT_TYPE, message, data)
+            return
+
+        count = len(pending)
+        await self._emit(
+            self.BATCH_EVENT_TYPE,
+            f"{pending[0][0]} 等 {count} 条",
+            {
+                "version": self.BATCH_EVENT_VERSION,
+                "sec_user_id": self._sec_user_id,
+                "count": count,
+                "events": [data for _, data in pending],
+            },
+        )
+
+
+class ExifToolDaemonError(OSError):
+    """常驻 exiftool 中途失败；completed 为失败前已拿到结果的批次（按提交顺序）。"""
+
+    def __init__(self, message: str, completed: list[tuple[bool, str]]) -> None:
+        super().__init__(message)
+        self.completed = completed
+
+
+class ExifToolDaemon:
+    """常驻的 exiftool -stay_open 进程，首次写入时启动；除 terminate() 外实例不是线程安全的。"""
+
+    PIPELINE_MAX_BATCHES = 64
+    PIPELINE_MAX_FILES = 256
+    # 每轮读写的超时，与逐批调用 exiftool 的超时计算方式一致：基础 200 秒 + 每个文件 2 秒
+    ROUND_TIMEOUT_SECONDS = 200
+    ROUND_TIMEOUT_PER_FILE_SECONDS = 2
+
+    def __init__(self) -> None:
+        self._process: subprocess.Popen[bytes] | None = None
+        self._buffer = b""
+        self._seq = 0
+        self._broken = False
 
-        level = record.levelname.lower()
+    def __enter__(self) -> ExifToolDaemon:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def available(self) -> bool:
+        return not self._broken
+
+    def write_tags(self, tag_args: list[str], file_paths: list[Path]) -> tuple[bool, str]:
+        """对一批文件执行一次 -execute，返回 (是否无错误, exiftool 输出)。
+
+        进程无法启动、意外退出或超时未响应时抛出 OSError（超时为 TimeoutError），
+        之后该实例不再可用。
+        """
+        return self.write_tags_many([(tag_args, file_paths)])[0]
+
+    def write_tags_many(
+        self,
+        batches: list[tuple[list[str], list[Path]]],
+    ) -> list[tuple[bool, str]]:
+        """流水线提交多批 -execute，按批返回结果。
+
+        每轮最多提交 PIPELINE_MAX_BATCHES 批、PIPELINE_MAX_FILES 个文件后再统一读取，
+        限制未读取的输出量，避免 exiftool 写满 stdout 管道而与写入端互相等待。
+        每轮的写入与读取共用一个截止时间，超时即杀掉进程并抛出 TimeoutError。
+        """
+        if self._broken:
+            raise OSError("exiftool daemon is not available")
+
+        results: list[tuple[bool, str]] = []
         try:
-            asyncio.run_coroutine_threadsafe(
-                self._emit(
-                    "crawler_log",
-                    message,
-                    {"level": level, "logger": record.name},
-                ),
-                self._loop,
-            )
-        except RuntimeError:
+            process = self._ensure_started()
+            index = 0
+            while index < len(batches):
+                lines: list[str] = []
+                markers: list[bytes] = []
+                file_count = 0
+                while index < len(batches) and len(markers) < self.PIPELINE_MAX_BATCHES:
+                    tag_args, file_paths = batches[index]
+                    if markers and file_count + len(file_paths) > self.PIPELINE_MAX_FILES:
+                        break
+                    self._seq += 1
+                    markers.append(f"{{ready{self._seq}}}".encode("ascii"))
+                    lines.extend(tag_args)
+                    lines.extend(str(path) for path in file_paths)
+                    lines.append(f"-execute{self._seq}")
+                    file_count += len(file_paths)
+                    index += 1
+
+                deadline = time.monotonic() + (
+                    self.ROUND_TIMEOUT_SECONDS + self.ROUND_TIMEOUT_PER_FILE_SECONDS * file_count
+                )
+                self._write_all(process, ("\n".join(lines) + "\n").encode("utf-8"), deadline)
+                for marker in markers:
+                    results.append(self._read_result(process, marker, deadline))
+        except (OSError, ValueError) as exc:
+            self._broken = True
+            self.kill()
+            # 附带已完成批次的结果，调用方只需为剩余批次降级处理
+            raise ExifToolDaemonError(str(exc), results) from exc
+
+        return results
+
+    @staticmethod
+    def _wait_ready(fileobj: Any, event: int, deadline: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            with selectors.DefaultSelector() as selector:
+                selector.register(fileobj, event)
+                if selector.select(remaining):
+                    return
+        raise TimeoutError("exiftool daemon did not respond before the deadline")
+
+    def _write_all(self, process: subprocess.Popen[bytes], data: bytes, deadline: float) -> None:
+        assert process.stdin is not None
+        view = memoryview(data)
+        while view:
+            self._wait_ready(process.stdin, selectors.EVENT_WRITE, deadline)
+            try:
+                written = os.write(process.stdin.fileno(), view)
+            except BlockingIOError:
+                continue
+            view = view[written:]
+
+    def _read_result(
+        self,
+        process: subprocess.Popen[bytes],
+        marker: bytes,
+        deadline: float,
+    ) -> tuple[bool, str]:
+        assert process.stdout is not None
+        output: list[bytes] = []
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                self._wait_ready(process.stdout, selectors.EVENT_READ, deadline)
+                try:
+                    chunk = os.read(process.stdout.fileno(), 65536)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    raise OSError("exiftool daemon exited unexpectedly")
+                self._buffer += chunk
+                continue
+
+            line = self._buffer[:newline].rstrip(b"\r")
+            self._buffer = self._buffer[newline + 1 :]
+            if line == marker:
+                break
+            output.append(line)
+
+        text = [line.decode("utf-8", errors="replace") for line in output]
+        ok = not any(line.startswith("Error") for line in text)
+        return ok, "\n".join(text).strip()
+
+    def close(self) -> None:
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        self._buffer = b""
+        try:
+            assert process.stdin is not None
+            os.set_blocking(process.stdin.fileno(), True)
+            process.stdin.write(b"-stay_open\nFalse\n")
+            process.stdin.flush()
+            process.stdin.close()
+            process.wait(timeout=10)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout is not None:
+                process.stdout.close()
+
+    def kill(self) -> None:
+        """强制结束进程，用于超时或管道异常后，不再等待 exiftool 正常退出。"""
+        process = self._process
+        if process is None:
+            return
+        self._process = None
+        self._buffer = b""
+        process.kill()
+        process.wait()
+        for pipe in (process.stdin, process.stdout):
+            if pipe is not None:
+                try:
+                    pipe.close()
+                except OSError:
+                    pass
+
+    def terminate(self) -> None:
+        """从其他线程强制结束子进程：只发送信号，不改动实例状态与管道。
+
+        使用该实例的线程随后会读到 EOF 并自行 kill()/close() 清理，避免关闭正在被读写的 fd。
+        """
+        process = self._process
+        if process is None:
             return
+        try:
+            process.kill()
+        except OSError:
+            pass
+
+    def _ensure_started(self) -> subprocess.Popen[bytes]:
+        if self._process is None:
+            # stderr 并入 stdout，避免单独的 stderr 管道写满导致阻塞；
+            # 管道不经缓冲并设为非阻塞，读写都可以按截止时间等待
+            process = subprocess.Popen(
+                [
+                    "exiftool",
+                    "-stay_open",
+                    "True",
+                    "-@",
+                    "-",
+                    "-common_args",
+                    "-overwrite_original",
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+            )
+            assert process.stdin is not None and process.stdout is not None
+            os.set_blocking(process.stdin.fileno(), False)
+            os.set_blocking(process.stdout.fileno(), False)
+            self._process = process
+        return self._process
 
 
 class DouyinCrawlerService:
     FILE_TIME_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}-\d{2}-\d{2})")
+    FILE_TIME_LENGTH = 19
+    # EXIF 并行会话数上限，以及每个会话至少分摊的文件数
+    EXIF_MAX_WORKERS = 4
+    EXIF_FILES_PER_WORKER = 32
+    # existing_times 持久化格式版本，格式变化时旧缓存自动失效
+    EXISTING_TIMES_CACHE_VERSION = "v2"
 
     def __init__(self) -> None:
         requested_state_dir = Path(os.getenv("STATE_DIR", "/data/state"))
@@ -121,6 +495,14 @@ class DouyinCrawlerService:
             fallback.mkdir(parents=True, exist_ok=True)
             return fallback
 
+    @classmethod
+    def _search_file_time(cls, name: str) -> str | None:
+        # 时间戳可能出现在文件名任意位置，先用长度与空格做廉价预筛，再交给正则确认
+        if len(name) < cls.FILE_TIME_LENGTH or " " not in name:
+            return None
+        match = cls.FILE_TIME_PATTERN.search(name)
+        return match.group(1) if match else None
+
     @staticmethod
     def _build_f2_config(settings: DownloaderSettings) -> dict[str, Any]:
         return {
@@ -156,40 +538,64 @@ class DouyinCrawlerService:
             "incremental_threshold": settings.incremental_threshold,
         }
 
-    @staticmethod
-    def get_existing_video_times(user_path: Path) -> set[str]:
+    @classmethod
+    def get_existing_video_times(cls, user_path: Path) -> set[str]:
         existing_times: set[str] = set()
         if not user_path.exists():
             return existing_times
 
-        time_pattern = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}-\d{2}-\d{2})")
         try:
             for file_path in user_path.iterdir():
                 if file_path.is_file():
-                    match = time_pattern.search(file_path.name)
-                    if match:
-                        existing_times.add(match.group(1))
+                    file_time = cls._search_file_time(file_path.name)
+                    if file_time:
+                        existing_times.add(file_time)
         except Exception:
             return existing_times
 
         return existing_times
 
+    def _load_existing_video_times(self, sec_user_id: str, user_path: Path) -> set[int]:
+        """读取用户目录已有作品的 Unix 秒级时间，目录 mtime 未变化时直接使用上次持久化的结果。"""
+        try:
+            mtime_ns = user_path.stat().st_mtime_ns
+        except OSError:
+            return set()
+
+        # sec_user_id 可能来自用户原样输入，文件名取其哈希，避免路径穿越到缓存目录之外
+        cache_name = hashlib.sha256(sec_user_id.encode("utf-8")).hexdigest()
+        cache_file = self._state_dir / "existing_times" / f"{cache_name}.times"
+        header = f"{self.EXISTING_TIMES_CACHE_VERSION}\t{user_path}\t{mtime_ns}"
+        try:
+            lines = cache_file.read_text(encoding="utf-8").splitlines()
+            if lines and lines[0] == header:
+                return {int(line) for line in lines[1:]}
+        except (OSError, ValueError):
+            pass
+
+        existing_times: set[int] = set()
+        for file_time in self.get_existing_video_times(user_path):
+            timestamp = _parse_ct_cached(file_time)
+            if timestamp is not None:
+                existing_times.add(int(timestamp))
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            tmp.write_text(
+                "\n".join([header, *map(str, sorted(existing_times))]), encoding="utf-8"
+            )
+            os.replace(tmp, cache_file)
+        except OSError as exc:
+            logger.debug("persist existing times failed for %s: %s", sec_user_id, exc)
+        return existing_times
+
     @staticmethod
     def update_media_exif(file_path: Path, create_time_timestamp: float) -> bool:
         try:
-            aware_dt = dt_mod.datetime.fromtimestamp(create_time_timestamp, tz=_TZ_CN)
-            exif_time = aware_dt.strftime("%Y:%m:%d %H:%M:%S+08:00")
             cmd = [
                 "exiftool",
                 "-overwrite_original",
-                "-CreateDate=" + exif_time,
-                "-ModifyDate=" + exif_time,
-                "-DateTimeOriginal=" + exif_time,
-                "-CreationDate=" + exif_time,
-                "-TrackCreateDate=" + exif_time,
-                "-TrackModifyDate=" + exif_time,
-                "-MediaCreateDate=" + exif_time,
-                "-MediaModifyDate=" + exif_time,
+                *DouyinCrawlerService._exif_tag_args(create_time_timestamp),
                 str(file_path),
             ]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
@@ -205,22 +611,11 @@ class DouyinCrawlerService:
             exif_logger.error("ERROR %s | %s", file_path, exc)
             return False
 
-    @classmethod
-    def update_media_exif_batch(
-        cls,
-        file_paths: list[Path],
-        create_time_timestamp: float,
-        chunk_size: int = 50,
-    ) -> tuple[int, list[str]]:
-        """返回 (成功数, 失败文件名列表)。"""
-        if not file_paths:
-            return 0, []
-
+    @staticmethod
+    def _exif_tag_args(create_time_timestamp: float) -> list[str]:
         aware_dt = dt_mod.datetime.fromtimestamp(create_time_timestamp, tz=_TZ_CN)
         exif_time = aware_dt.strftime("%Y:%m:%d %H:%M:%S+08:00")
-        base_cmd = [
-            "exiftool",
-            "-overwrite_original",
+        return [
             "-CreateDate=" + exif_time,
             "-ModifyDate=" + exif_time,
             "-DateTimeOriginal=" + exif_time,
@@ -231,13 +626,196 @@ class DouyinCrawlerService:
             "-MediaModifyDate=" + exif_time,
         ]
 
+    @classmethod
+    def _update_media_exif_with_daemon(
+        cls,
+        exif_daemon: ExifToolDaemon,
+        file_paths: list[Path],
+        tag_args: list[str],
+    ) -> tuple[int, list[str]]:
+        ok, output = exif_daemon.write_tags(tag_args, file_paths)
+        if ok:
+            return len(file_paths), []
+        return cls._retry_media_exif_with_daemon(exif_daemon, file_paths, tag_args, output)
+
+    @staticmethod
+    def _retry_media_exif_with_daemon(
+        exif_daemon: ExifToolDaemon,
+        file_paths: list[Path],
+        tag_args: list[str],
+        output: str,
+    ) -> tuple[int, list[str]]:
+        logger.warning("EXIF 批量更新部分失败 (%d 个文件): %s", len(file_paths), output)
+        exif_logger.warning("DAEMON BATCH FAIL files=%d | %s", len(file_paths), output)
+
+        # 批次失败时逐个文件重试，定位失败文件
+        updated = 0
+        failed_files: list[str] = []
+        for file_path in file_paths:
+            ok, output = exif_daemon.write_tags(tag_args, [file_path])
+            if ok:
+                updated += 1
+                exif_logger.debug("OK %s", file_path.name)
+            else:
+                failed_files.append(file_path.name)
+                exif_logger.warning("FAIL %s | %s", file_path, output)
+        return updated, failed_files
+
+    @classmethod
+    def update_media_exif_groups(
+        cls,
+        grouped_files: dict[float, list[Path]],
+        exif_daemon: ExifToolDaemon,
+    ) -> tuple[int, list[str]]:
+        """时间分组在常驻 exiftool 会话中流水线执行，文件较多时并行多个会话。
+
+        返回 (成功数, 失败文件名列表)。
+        """
+        updated = 0
+        failed_files: list[str] = []
+        # argfile 按行分隔参数，含换行符的路径只能走命令行方式
+        pending: list[tuple[float, list[Path]]] = []
+        for ts, paths in grouped_files.items():
+            if any("\n" in str(path) for path in paths):
+                ok_count, fail_names = cls.update_media_exif_batch(paths, ts)
+                updated += ok_count
+                failed_files.extend(fail_names)
+            else:
+                pending.append((ts, paths))
+
+        if not pending:
+            return updated, failed_files
+
+        # 文件较多时按分组轮转切分给多个 exiftool 会话并行执行；
+        # 工作都在 exiftool 子进程中，线程只负责读写管道，无需进程池
+        total_files = sum(len(paths) for _, paths in pending)
+        workers = min(
+            cls.EXIF_MAX_WORKERS,
+            os.cpu_count() or 1,
+            len(pending),
+            max(1, total_files // cls.EXIF_FILES_PER_WORKER),
+        )
+        if workers <= 1:
+            ok_count, fail_names = cls._update_media_exif_shard(exif_daemon, pending)
+            return updated + ok_count, failed_files + fail_names
+
+        shards = [pending[index::workers] for index in range(workers)]
+
+        # 每个额外会话的读写都受 ExifToolDaemon 的截止时间约束，超时的会话在分片内即被杀掉；
+        # 若本线程出错，只向各额外会话的子进程发送信号，管道由所属工作线程在 finally 中关闭，
+        # 工作线程读到 EOF 后即返回，保证退出 with 时 executor.shutdown 不会被卡住
+        extra_daemons = [ExifToolDaemon() for _ in shards[1:]]
+
+        def _run_extra_shard(
+            extra_daemon: ExifToolDaemon,
+            shard: list[tuple[float, list[Path]]],
+        ) -> tuple[int, list[str]]:
+            try:
+                return cls._update_media_exif_shard(extra_daemon, shard)
+            except BaseException:
+                extra_daemon.kill()
+                raise
+            finally:
+                extra_daemon.close()
+
+        with ThreadPoolExecutor(max_workers=workers - 1) as executor:
+            futures = [
+                executor.submit(_run_extra_shard, extra_daemon, shard)
+                for extra_daemon, shard in zip(extra_daemons, shards[1:])
+            ]
+            try:
+                ok_count, fail_names = cls._update_media_exif_shard(exif_daemon, shards[0])
+                updated += ok_count
+                failed_files.extend(fail_names)
+                for future in futures:
+                    ok_count, fail_names = future.result()
+                    updated += ok_count
+                    failed_files.extend(fail_names)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                for extra_daemon in extra_daemons:
+                    extra_daemon.terminate()
+                raise
+        return updated, failed_files
+
+    @classmethod
+    def _update_media_exif_shard(
+        cls,
+        exif_daemon: ExifToolDaemon,
+        pending: list[tuple[float, list[Path]]],
+    ) -> tuple[int, list[str]]:
+        updated = 0
+        failed_files: list[str] = []
+        batches = [(cls._exif_tag_args(ts), paths) for ts, paths in pending]
+        try:
+            results = exif_daemon.write_tags_many(batches)
+        except OSError as exc:
+            # 已返回结果的批次照常统计，只有未完成的批次改为逐批调用
+            results = exc.completed if isinstance(exc, ExifToolDaemonError) else []
+            logger.warning(
+                "exiftool 常驻进程不可用，剩余 %d 批改为逐批调用: %s",
+                len(pending) - len(results),
+                exc,
+            )
+            exif_logger.error("DAEMON ERROR | %s", exc)
+            for ts, paths in pending[len(results) :]:
+                ok_count, fail_names = cls.update_media_exif_batch(paths, ts)
+                updated += ok_count
+                failed_files.extend(fail_names)
+
+        for (ts, paths), (tag_args, _), (ok, output) in zip(pending, batches, results):
+            if ok:
+                updated += len(paths)
+                continue
+            if not exif_daemon.available:
+                ok_count, fail_names = cls.update_media_exif_batch(paths, ts)
+                updated += ok_count
+                failed_files.extend(fail_names)
+                continue
+            try:
+                ok_count, fail_names = cls._retry_media_exif_with_daemon(
+                    exif_daemon, paths, tag_args, output
+                )
+            except OSError:
+                ok_count, fail_names = 0, [path.name for path in paths]
+            updated += ok_count
+            failed_files.extend(fail_names)
+        return updated, failed_files
+
+    @classmethod
+    def update_media_exif_batch(
+        cls,
+        file_paths: list[Path],
+        create_time_timestamp: float,
+        chunk_size: int = 2000,
+        exif_daemon: ExifToolDaemon | None = None,
+    ) -> tuple[int, list[str]]:
+        """返回 (成功数, 失败文件名列表)。"""
+        if not file_paths:
+            return 0, []
+
+        tag_args = cls._exif_tag_args(create_time_timestamp)
+        # argfile 按行分隔参数，含换行符的路径只能走命令行方式，并按 ARG_MAX 限制分块
+        use_argfile = not any("\n" in str(path) for path in file_paths)
+        if not use_argfile:
+            chunk_size = min(chunk_size, 50)
+
+        if exif_daemon is not None and exif_daemon.available and use_argfile:
+            try:
+                return cls._update_media_exif_with_daemon(exif_daemon, file_paths, tag_args)
+            except OSError as exc:
+                logger.warning("exiftool 常驻进程不可用，改为逐批调用: %s", exc)
+                exif_logger.error("DAEMON ERROR | %s", exc)
+
+        base_cmd = ["exiftool", "-overwrite_original", *tag_args]
+
         updated = 0
         failed_files: list[str] = []
         for i in range(0, len(file_paths), chunk_size):
             chunk = file_paths[i : i + chunk_size]
             try:
-                cmd = [*base_cmd, *[str(path) for path in chunk]]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=200)
+                result = cls._run_exiftool_chunk(base_cmd, chunk, use_argfile)
                 if result.returncode == 0:
                     updated += len(chunk)
                     continue
@@ -258,34 +836,66 @@ class DouyinCrawlerService:
 
         return updated, failed_files
 
+    @staticmethod
+    def _run_exiftool_chunk(
+        base_cmd: list[str],
+        chunk: list[Path],
+        use_argfile: bool,
+    ) -> subprocess.CompletedProcess[str]:
+        timeout = 200 + 2 * len(chunk)
+        if not use_argfile:
+            cmd = [*base_cmd, *[str(path) for path in chunk]]
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+        # 文件路径通过 -@ argfile 传入，不受命令行长度限制
+        with tempfile.NamedTemporaryFile(
+            mode="w", encoding="utf-8", suffix=".args", delete=False
+        ) as argfile:
+            argfile.write("\n".join(str(path) for path in chunk))
+            argfile.write("\n")
+        try:
+            cmd = [*base_cmd, "-@", argfile.name]
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        finally:
+            os.unlink(argfile.name)
+
     @staticmethod
     def _parse_create_time_timestamp(create_time: Any) -> float | None:
         if create_time is None:
             return None
+        if isinstance(create_time, (str, int, float)):
+            return _parse_ct_cached(create_time)
+        return _parse_ct(create_time)
 
-        try:
-            if isinstance(create_time, str):
-                if "-" in create_time and " " in create_time:
-                    # f2 用 +08:00 时区格式化，解析时也按 +08:00 还原
-                    naive = dt_mod.datetime.strptime(create_time, "%Y-%m-%d %H-%M-%S")
-                    aware = naive.replace(tzinfo=_TZ_CN)
-                    timestamp = aware.timestamp()
-                else:
-                    timestamp = float(create_time)
-            else:
-                timestamp = float(create_time)
-
-            if timestamp > 1e10:
-                timestamp /= 1000
-            return timestamp
-        except Exception:
-            return None
+    @staticmethod
+    def _iter_files(
+        root: Path,
+        skip_dir: Callable[[str], bool] | None = None,
+    ) -> Iterator[os.DirEntry[str]]:
+        # 显式栈 + scandir 遍历，文件类型来自目录项缓存，不再逐个 stat；不跟随目录软链接
+        # skip_dir 按目录名判断是否跳过整个子目录
+        stack = [str(root)]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if skip_dir is None or not skip_dir(entry.name):
+                                    stack.append(entry.path)
+                            elif entry.is_file():
+                                yield entry
+                        except OSError:
+                            continue
+            except OSError:
+                continue
 
     @classmethod
     def process_downloaded_files(
         cls,
         user_path: Path,
         aweme_data_list: list[dict[str, Any]],
+        exif_daemon: ExifToolDaemon | None = None,
     ) -> dict[str, int | float]:
         start_time = perf_counter()
         stats: dict[str, Any] = {
@@ -312,30 +922,28 @@ class DouyinCrawlerService:
 
             if create_time:
                 timestamp_by_time_str[str(create_time)] = timestamp
-            formatted_time = dt_mod.datetime.fromtimestamp(
-                timestamp, tz=_TZ_CN
-            ).strftime("%Y-%m-%d %H-%M-%S")
-            timestamp_by_time_str[formatted_time] = timestamp
+            timestamp_by_time_str[_fmt_time(int(timestamp))] = timestamp
 
         if not timestamp_by_time_str:
             return stats
 
-        grouped_files: dict[float, list[Path]] = defaultdict(list)
-        for file_path in user_path.rglob("*"):
-            if not file_path.is_file():
-                continue
+        def skip_dir(name: str) -> bool:
+            # folderize 时每个作品一个以时间命名的子目录，非本轮作品的目录整棵跳过
+            dir_time = cls._search_file_time(name)
+            return dir_time is not None and dir_time not in timestamp_by_time_str
 
+        grouped_files: dict[float, list[Path]] = defaultdict(list)
+        for entry in cls._iter_files(user_path, skip_dir):
             stats["files_scanned"] += 1
-            match = cls.FILE_TIME_PATTERN.search(file_path.name)
-            if not match:
+            file_time = cls._search_file_time(entry.name)
+            if not file_time:
                 continue
 
-            file_time = match.group(1)
             timestamp = timestamp_by_time_str.get(file_time)
             if timestamp is None:
                 continue
 
-            grouped_files[timestamp].append(file_path)
+            grouped_files[timestamp].append(Path(entry.path))
             stats["matched_files"] += 1
 
         stats["time_groups"] = len(grouped_files)
@@ -348,17 +956,24 @@ class DouyinCrawlerService:
                 stats["aweme_items"],
             )
 
-        max_workers = min(8, os.cpu_count() or 4)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(cls.update_media_exif_batch, paths, ts): ts
-                for ts, paths in grouped_files.items()
-            }
-            for future in as_completed(futures):
-                ok_count, fail_names = future.result()
-                stats["updated_files"] += ok_count
-                stats["failed_files"] += len(fail_names)
-                stats["failed_list"].extend(fail_names)
+        if exif_daemon is not None:
+            # 所有分组共用一个常驻 exiftool 会话，无需为每组启动进程
+            ok_count, fail_names = cls.update_media_exif_groups(grouped_files, exif_daemon)
+            stats["updated_files"] += ok_count
+            stats["failed_files"] += len(fail_names)
+            stats["failed_list"].extend(fail_names)
+        else:
+            max_workers = min(8, os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(cls.update_media_exif_batch, paths, ts): ts
+                    for ts, paths in grouped_files.items()
+                }
+                for future in as_completed(futures):
+                    ok_count, fail_names = future.result()
+                    stats["updated_files"] += ok_count
+                    stats["failed_files"] += len(fail_names)
+                    stats["failed_list"].extend(fail_names)
 
         stats["elapsed_seconds"] = round(perf_counter() - start_time, 2)
 
@@ -387,6 +1002,7 @@ class DouyinCrawlerService:
         cancel_event: asyncio.Event,
         async_user_db_cls: Any,
     ) -> tuple[bool, int, int, str, dict[str, Any], str | None]:
+        exif_daemon: ExifToolDaemon | None = None
         try:
             async with async_user_db_cls(str(users_db_path)) as audb:
                 user_profile = await handler.fetch_user_profile(sec_user_id)
@@ -399,13 +1015,17 @@ class DouyinCrawlerService:
                 {"sec_user_id": sec_user_id, "nickname": user_nickname},
             )
 
-            existing_times: set[str] = set()
+            existing_times: set[int] = set()
             incremental_mode = bool(config.get("incremental_mode", False))
             incremental_threshold = int(config.get("incremental_threshold", 3))
             consecutive_existing_count = 0
 
             if incremental_mode:
-                existing_times = self.get_existing_video_times(user_path)
+                existing_times = await asyncio.to_thread(
+                    self._load_existing_video_times,
+                    sec_user_id,
+                    Path(user_path),
+                )
 
             video_count = 0
             new_video_count = 0
@@ -417,6 +1037,8 @@ class DouyinCrawlerService:
             }
 
             exif_aweme_data: list[dict[str, Any]] = []
+            if config.get("update_exif", False):
+                exif_daemon = ExifToolDaemon()
 
             async for aweme_list in handler.fetch_user_post_videos(
                 sec_user_id=sec_user_id,
@@ -439,7 +1061,9 @@ class DouyinCrawlerService:
                     filtered_list: list[dict[str, Any]] = []
                     for aweme_data in aweme_data_list:
                         create_time = aweme_data.get("create_time", "")
-                        if create_time in existing_times:
+                        # 统一按整数秒比较，兼容毫秒/秒/格式化字符串等不同表示
+                        timestamp = self._parse_create_time_timestamp(create_time)
+                        if timestamp is not None and int(timestamp) in existing_times:
                             skipped_count += 1
                             page_skipped_count += 1
                             consecutive_existing_count += 1
@@ -472,7 +1096,11 @@ class DouyinCrawlerService:
                 if aweme_data_list:
                     await downloader.create_download_tasks(config, aweme_data_list, user_path)
                     if config.get("update_exif", False):
-                        exif_aweme_data.extend(list(aweme_data_list))
+                        # EXIF 只用到 create_time，不保留整条作品数据，避免跨页累积占用内存
+                        exif_aweme_data.extend(
+                            {"create_time": aweme_data.get("create_time")}
+                            for aweme_data in aweme_data_list
+                        )
 
                     # 合成 live 图为安卓 Motion Photo
                     if config.get("live_compose", False):
@@ -529,6 +1157,7 @@ class DouyinCrawlerService:
                     self.process_downloaded_files,
                     user_path,
                     exif_aweme_data,
+                    exif_daemon,
                 )
                 failed_list = exif_stats.get("failed_list", [])
                 failed_detail = ""
@@ -588,6 +1217,9 @@ class DouyinCrawlerService:
                 {"files_scanned": 0, "updated_files": 0, "failed_files": 0},
                 str(exc),
             )
+        finally:
+            if exif_daemon is not None:
+                await asyncio.to_thread(exif_daemon.close)
 
     async def run(
         self,
@@ -625,20 +1257,25 @@ class DouyinCrawlerService:
         handler = DouyinHandler(config)
         downloader = DouyinDownloader(config)
         loop = asyncio.get_running_loop()
-        bridge_handler = EmitBridgeLogHandler(loop, emit, stream_id=stream_id)
+        bridge_handler = EmitBridgeLogHandler(loop, emit)
+        if stream_id:
+            bridge_handler.addFilter(LogStreamFilter(stream_id))
         f2_logger.addHandler(bridge_handler)
         stream_token: contextvars.Token[str | None] | None = None
         if stream_id:
             stream_token = CURRENT_LOG_STREAM_ID.set(stream_id)
 
         try:
+            # 解析时即去重：重复链接不再重复请求 sec_user_id
             user_ids: list[str] = []
             user_urls: list[str] = []
+            seen: set[str] = set()
 
             for user_target in user_list:
                 item = user_target.url.strip()
-                if not item:
+                if not item or item in seen:
                     continue
+                seen.add(item)
                 if item.startswith(("http://", "https://")):
                     user_urls.append(item)
                 else:
@@ -647,9 +1284,11 @@ class DouyinCrawlerService:
             if user_urls:
                 valid_urls = extract_valid_urls(user_urls) or []
                 url_user_ids = await SecUserIdFetcher.get_all_sec_user_id(valid_urls)
-                user_ids.extend([uid for uid in url_user_ids if uid])
+                for uid in url_user_ids:
+                    if uid and uid not in seen:
+                        seen.add(uid)
+                        user_ids.append(uid)
 
-            user_ids = list(dict.fromkeys(user_ids))
             if not user_ids:
                 raise ValueError("未找到有效用户 ID，请检查输入")
 
@@ -675,6 +1314,8 @@ class DouyinCrawlerService:
                     if cancel_event.is_set():
                         return
 
+                    # 每个用户独立合并，跳过事件不会跨用户合并
+                    coalescer = EventCoalescer(emit, user_id)
                     try:
                         success, new_count, skipped_count, nickname, exif_stats, error_message = (
                             await self._download_user_videos(
@@ -683,14 +1324,14 @@ class DouyinCrawlerService:
                                 config,
                                 user_id,
                                 users_db_path,
-                                emit,
+                                coalescer.emit,
                                 cancel_event,
                                 AsyncUserDB,
                             )
                         )
                     except Exception as exc:
                         short_id = user_id[:15]
-                        await emit(
+                        await coalescer.emit(
                             "user_failed",
                             f"用户 {short_id} 下载失败: {exc}",
                             {"sec_user_id": user_id, "error": str(exc)},
@@ -703,6 +1344,8 @@ class DouyinCrawlerService:
                             {"files_scanned": 0, "updated_files": 0, "failed_files": 0},
                             str(exc),
                         )
+                    finally:
+                        await coalescer.aclose()
 
                     user_stat = UserStat(
                         nickname=nickname,
@@ -727,8 +1370,10 @@ class DouyinCrawlerService:
                     else:
                         stats["failed"] += 1
 
-            tasks = [asyncio.create_task(limited_download(uid)) for uid in user_ids]
-            await asyncio.gather(*tasks)
+            # 各用户结果在任务内直接汇入 stats，TaskGroup 不再额外持有结果列表
+            async with asyncio.TaskGroup() as task_group:
+                for uid in user_ids:
+                    task_group.create_task(limited_download(uid))
 
             return TaskResult(
                 total=stats["total"],
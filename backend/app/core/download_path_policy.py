@@ -6,6 +6,12 @@ import re
 from pathlib import Path
 from uuid import uuid4
 
+_SPLIT_RE = re.compile(r"[,\n;]")
+_JSON_START = ("{", "[")
+_JSON_END = ("}", "]")
+_JSON_LEADING_CHARS = "{[ \t\r\n"
+_NORMALIZE_CACHE_SIZE = 256
+
 
 class DownloadPathPolicy:
     def __init__(
@@ -15,20 +21,30 @@ class DownloadPathPolicy:
         accessible_paths_file: str | Path | None = None,
     ) -> None:
         self._app_env = app_env
-        self._default_download_dir = default_download_dir.resolve(strict=False)
+        self._default_download_dir = Path(os.path.abspath(default_download_dir))
         file_from_env = os.getenv("TRIM_DATA_ACCESSIBLE_PATHS_FILE", "").strip()
         file_path = file_from_env or accessible_paths_file
         self._accessible_paths_file = (
-            Path(file_path).expanduser().resolve(strict=False) if file_path else None
+            Path(os.path.abspath(os.path.expanduser(file_path))) if file_path else None
         )
+        self._roots_cache: tuple[tuple[str, str, int], list[Path]] | None = None
+        # raw_path -> 规范化结果；结果只取决于输入与固定的默认下载目录
+        self._normalize_cache: dict[str, str] = {}
 
     @property
     def allowed_roots(self) -> list[str]:
         return [str(item) for item in self._collect_allowed_roots()]
 
     def normalize(self, raw_path: str) -> str:
-        candidate = self._resolve_candidate(raw_path)
-        return str(candidate)
+        cached = self._normalize_cache.get(raw_path)
+        if cached is not None:
+            return cached
+
+        normalized = str(self._resolve_candidate(raw_path))
+        if len(self._normalize_cache) >= _NORMALIZE_CACHE_SIZE:
+            self._normalize_cache.clear()
+        self._normalize_cache[raw_path] = normalized
+        return normalized
 
     def ensure_writable(self, raw_path: str) -> str:
         candidate = Path(self.normalize(raw_path))
@@ -56,64 +72,59 @@ class DownloadPathPolicy:
         return str(candidate)
 
     def _collect_allowed_roots(self) -> list[Path]:
+        fingerprint = self._roots_fingerprint()
+        cached = self._roots_cache
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        roots = self._build_allowed_roots()
+        self._roots_cache = (fingerprint, roots)
+        return roots
+
+    def _roots_fingerprint(self) -> tuple[str, str, int]:
+        mtime_ns = 0
+        if self._accessible_paths_file:
+            try:
+                mtime_ns = os.stat(self._accessible_paths_file).st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+        return (
+            os.getenv("TRIM_DATA_ACCESSIBLE_PATHS", ""),
+            os.getenv("TRIM_DATA_SHARE_PATHS", ""),
+            mtime_ns,
+        )
+
+    def _build_allowed_roots(self) -> list[Path]:
         roots: list[Path] = [self._default_download_dir]
 
         for env_key in ("TRIM_DATA_ACCESSIBLE_PATHS", "TRIM_DATA_SHARE_PATHS"):
-            raw_value = os.getenv(env_key, "")
-            for raw_item in self._split_env_paths(raw_value):
-                item = raw_item.strip()
-                if not item:
-                    continue
-                candidate = Path(item).expanduser()
-                if not candidate.is_absolute():
-                    continue
-                roots.append(candidate.resolve(strict=False))
-
-            for raw_item in self._extract_json_paths(raw_value):
-                item = raw_item.strip()
-                if not item:
-                    continue
-                candidate = Path(item).expanduser()
-                if not candidate.is_absolute():
-                    continue
-                roots.append(candidate.resolve(strict=False))
+            self._ingest(os.getenv(env_key, ""), roots)
 
         if self._accessible_paths_file and self._accessible_paths_file.exists():
             try:
                 raw_value = self._accessible_paths_file.read_text(encoding="utf-8")
             except OSError:
                 raw_value = ""
+            self._ingest(raw_value, roots)
 
-            for raw_item in self._split_env_paths(raw_value):
-                item = raw_item.strip()
-                if not item:
-                    continue
-                candidate = Path(item).expanduser()
-                if not candidate.is_absolute():
-                    continue
-                roots.append(candidate.resolve(strict=False))
-
-            for raw_item in self._extract_json_paths(raw_value):
-                item = raw_item.strip()
-                if not item:
-                    continue
-                candidate = Path(item).expanduser()
-                if not candidate.is_absolute():
-                    continue
-                roots.append(candidate.resolve(strict=False))
-
-        unique_roots: list[Path] = []
-        for root in roots:
-            if root not in unique_roots:
-                unique_roots.append(root)
-        return unique_roots
+        return list(dict.fromkeys(roots))
+
+    def _ingest(self, raw: str, out: list[Path]) -> None:
+        for raw_item in (*self._split_env_paths(raw), *self._extract_json_paths(raw)):
+            item = raw_item.strip()
+            if not item:
+                continue
+            expanded = os.path.expanduser(item)
+            if not os.path.isabs(expanded):
+                continue
+            out.append(Path(os.path.abspath(expanded)))
 
     @staticmethod
     def _split_env_paths(raw: str) -> list[str]:
         if not raw.strip():
             return []
 
-        first_pass = re.split(r"[,\n;]", raw)
+        first_pass = _SPLIT_RE.split(raw)
         all_paths: list[str] = []
         for item in first_pass:
             token = item.strip()
@@ -127,14 +138,16 @@ class DownloadPathPolicy:
 
     @staticmethod
     def _extract_json_paths(raw: str) -> list[str]:
+        # 普通路径列表首字符即可排除，避免每次都 strip 复制整串
+        if not raw or raw[0] not in _JSON_LEADING_CHARS:
+            return []
+
         text = raw.strip()
         if not text:
             return []
 
-        if not (
-            (text.startswith("{") and text.endswith("}"))
-            or (text.startswith("[") and text.endswith("]"))
-        ):
+        # 括号不配对的情况交给 json.loads 失败处理
+        if not text.startswith(_JSON_START) or not text.endswith(_JSON_END):
             return []
 
         try:
@@ -168,10 +181,8 @@ class DownloadPathPolicy:
         if not path_text:
             raise ValueError("下载目录不能为空")
 
-        candidate = Path(path_text).expanduser()
-        if not candidate.is_absolute():
-            candidate = (self._default_download_dir / candidate).resolve(strict=False)
-        else:
-            candidate = candidate.resolve(strict=False)
-
-        return candidate
+        # 仅做字符串层面的规范化，避免 resolve() 逐级 lstat 带来的系统调用开销
+        expanded = os.path.expanduser(path_text)
+        if not os.path.isabs(expanded):
+            expanded = os.path.join(self._default_download_dir, expanded)
+        return Path(os.path.abspath(expanded))
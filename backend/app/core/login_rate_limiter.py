@@ -1,8 +1,6 @@
 from __future__ import annotations
 
-import asyncio
 import time
-from collections import defaultdict, deque
 
 
 class LoginRateLimiter:
@@ -15,54 +13,63 @@ class LoginRateLimiter:
         self._max_attempts = max(1, max_attempts)
         self._window_seconds = max(30, window_seconds)
         self._block_seconds = max(30, block_seconds)
-        self._attempts: dict[str, deque[float]] = defaultdict(deque)
+        # 每个 key 一个长度为 max_attempts 的环形缓冲区及下一个写入位置；
+        # 写入后 ring[idx] 即为最近 max_attempts 次失败中最早的一次。
+        self._attempts: dict[str, tuple[list[float], int]] = {}
         self._blocked_until: dict[str, float] = {}
-        self._lock = asyncio.Lock()
+        self._last_sweep = time.monotonic()
 
+    # 以下方法内部没有 await，事件循环不会在中途切换协程，因此无需加锁。
     async def blocked_seconds(self, key: str) -> int:
-        async with self._lock:
-            return self._blocked_seconds_locked(key)
-
-    async def register_failure(self, key: str) -> int:
-        async with self._lock:
-            now = time.time()
-            self._prune_locked(key, now)
-            attempts = self._attempts[key]
-            attempts.append(now)
-            if len(attempts) < self._max_attempts:
-                return 0
-
-            block_until = now + self._block_seconds
-            self._blocked_until[key] = block_until
-            attempts.clear()
-            return int(self._block_seconds)
-
-    async def register_success(self, key: str) -> None:
-        async with self._lock:
-            self._attempts.pop(key, None)
-            self._blocked_until.pop(key, None)
-
-    def _blocked_seconds_locked(self, key: str) -> int:
-        now = time.time()
-        self._prune_locked(key, now)
+        now = time.monotonic()
+        self._prune(key, now)
         blocked_until = self._blocked_until.get(key)
         if not blocked_until:
             return 0
         remaining = int(blocked_until - now)
         return max(0, remaining)
 
-    def _prune_locked(self, key: str, now: float) -> None:
+    async def register_failure(self, key: str) -> int:
+        now = time.monotonic()
+        self._prune(key, now)
+        ring, idx = self._attempts.get(key) or ([float("-inf")] * self._max_attempts, 0)
+        ring[idx] = now
+        idx = (idx + 1) % self._max_attempts
+        if now - ring[idx] > self._window_seconds:
+            self._attempts[key] = (ring, idx)
+            return 0
+
+        block_until = now + self._block_seconds
+        self._blocked_until[key] = block_until
+        self._attempts.pop(key, None)
+        return int(self._block_seconds)
+
+    async def register_success(self, key: str) -> None:
+        self._attempts.pop(key, None)
+        self._blocked_until.pop(key, None)
+
+    def _prune(self, key: str, now: float) -> None:
         blocked_until = self._blocked_until.get(key)
         if blocked_until and blocked_until <= now:
             self._blocked_until.pop(key, None)
 
-        attempts = self._attempts.get(key)
-        if not attempts:
-            return
+        entry = self._attempts.get(key)
+        if entry is not None:
+            ring, idx = entry
+            if now - ring[idx - 1] > self._window_seconds:
+                self._attempts.pop(key, None)
 
-        cutoff = now - self._window_seconds
-        while attempts and attempts[0] < cutoff:
-            attempts.popleft()
+        if now - self._last_sweep > self._window_seconds:
+            self._sweep(now)
 
-        if not attempts:
-            self._attempts.pop(key, None)
+    def _sweep(self, now: float) -> None:
+        # 定期清理不再访问的 key，避免长期运行时累积过期条目
+        self._last_sweep = now
+        self._blocked_until = {
+            key: until for key, until in self._blocked_until.items() if until > now
+        }
+        self._attempts = {
+            key: (ring, idx)
+            for key, (ring, idx) in self._attempts.items()
+            if now - ring[idx - 1] <= self._window_seconds
+        }
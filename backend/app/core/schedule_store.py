@@ -1,29 +1,120 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import sqlite3
-from datetime import datetime, timezone
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any, TypeVar
 
-from app.models import UserTarget
+import orjson
+
+from app.models import USER_LIST_ADAPTER, UserTarget
 
 LOGGER = logging.getLogger(__name__)
+_UTC = timezone.utc
+_T = TypeVar("_T")
+_EPOCH = datetime(1970, 1, 1, tzinfo=_UTC)
+_ONE_US = timedelta(microseconds=1)
+# 与 TaskStore 一致：其他连接持有写锁时最多等待 5 秒
+_BUSY_TIMEOUT_SECONDS = 5.0
+
+_COLUMNS_SQL = (
+    "schedule_id, name, enabled, cron_expr, user_list_json, "
+    "created_at, updated_at, last_run_at, last_task_id, next_run_at"
+)
+_LOAD_SQL = """
+SELECT
+    schedule_id,
+    name,
+    enabled,
+    cron_expr,
+    user_list_json,
+    created_at,
+    updated_at,
+    last_run_at,
+    last_task_id,
+    next_run_at
+FROM schedules
+ORDER BY created_at DESC
+"""
+_UPSERT_SQL = """
+INSERT INTO schedules (
+    schedule_id,
+    name,
+    enabled,
+    cron_expr,
+    user_list_json,
+    created_at,
+    updated_at,
+    last_run_at,
+    last_task_id,
+    next_run_at
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(schedule_id) DO UPDATE SET
+    name=excluded.name,
+    enabled=excluded.enabled,
+    cron_expr=excluded.cron_expr,
+    user_list_json=excluded.user_list_json,
+    updated_at=excluded.updated_at,
+    last_run_at=excluded.last_run_at,
+    last_task_id=excluded.last_task_id,
+    next_run_at=excluded.next_run_at
+"""
+# 迁移旧数据时使用：已存在的行保持不变，只补入缺失的行
+_INSERT_MISSING_SQL = f"""
+INSERT INTO schedules ({_COLUMNS_SQL})
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(schedule_id) DO NOTHING
+"""
+_DELETE_SQL = "DELETE FROM schedules WHERE schedule_id = ?"
+_CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schedules (
+    schedule_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    cron_expr TEXT NOT NULL,
+    user_list_json TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    last_run_at INTEGER,
+    last_task_id TEXT,
+    next_run_at INTEGER
+)
+"""
 
 
-def _to_iso(value: datetime | None) -> str | None:
-    return value.isoformat() if value else None
+def _to_us(value: datetime | None) -> int | None:
+    # 以 UTC 微秒整数存储，整数运算避免浮点误差；不带时区的时间按 UTC 处理
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=_UTC)
+    return (value - _EPOCH) // _ONE_US
+
+
+def _from_us(value: int | None) -> datetime | None:
+    if value is None:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
 
 
 def _from_iso(value: str | None) -> datetime | None:
+    # 仅用于迁移旧数据；不带时区的时间与旧版本一致按 UTC 处理
     if not value:
         return None
 
     dt = datetime.fromisoformat(value)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt
+    return dt if dt.tzinfo else dt.replace(tzinfo=_UTC)
+
+
+def _user_from_dict(item: dict) -> UserTarget:
+    # 用户列表在写入前已经过 API 层校验，结构可信，跳过 pydantic 校验
+    return UserTarget.model_construct(name=item.get("name", ""), url=item.get("url", ""))
 
 
 class ScheduleRecord:
@@ -68,76 +159,157 @@ class ScheduleRecord:
 class ScheduleStore:
     def __init__(self, db_file: str | Path) -> None:
         self._path = Path(db_file)
-        self._lock = asyncio.Lock()
+        # 单线程执行器天然串行化所有访问，SQLite 连接也固定在该线程上
+        self._executor: ThreadPoolExecutor | None = None
+        self._conn: sqlite3.Connection | None = None
 
     async def ensure(self) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._sync_ensure)
+        await self._run(self._sync_ensure)
 
     async def load_all(self) -> list[ScheduleRecord]:
-        async with self._lock:
-            return await asyncio.to_thread(self._sync_load_all)
+        return await self._run(self._sync_load_all)
 
     async def upsert(self, record: ScheduleRecord) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._sync_upsert, record)
+        await self._run(self._sync_upsert, record)
+
+    async def upsert_many(self, records: list[ScheduleRecord]) -> None:
+        if not records:
+            return
+        await self._run(self._sync_upsert_many, records)
 
     async def delete(self, schedule_id: str) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._sync_delete, schedule_id)
+        await self._run(self._sync_delete, schedule_id)
+
+    async def close(self) -> None:
+        executor = self._executor
+        if executor is None:
+            return
+        await self._run(self._sync_close)
+        self._executor = None
+        executor.shutdown(wait=False)
+
+    async def _run(self, func: Callable[..., _T], *args: Any) -> _T:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule-io")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
 
     def _connect(self) -> sqlite3.Connection:
+        # 长连接：只在执行器线程内创建和使用
+        if self._conn is not None:
+            return self._conn
+
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self._path)
+        conn = sqlite3.connect(
+            self._path,
+            timeout=_BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            cached_statements=256,
+        )
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
+        # 长连接只初始化一次：映射数据库文件并放大页缓存，重复 load_all 直接命中内存
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn = conn
         return conn
 
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _sync_close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     def _sync_ensure(self) -> None:
-        with self._connect() as conn:
+        with self._transaction() as conn:
+            tables = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' "
+                    "AND name IN ('schedules', 'schedules_legacy')"
+                )
+            }
+            columns = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(schedules)")}
+            if columns.get("created_at", "").upper() == "TEXT" or "schedules_legacy" in tables:
+                self._migrate_iso_columns(conn, tables, columns)
+            else:
+                conn.execute(_CREATE_TABLE_SQL)
             conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS schedules (
-                    schedule_id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    enabled INTEGER NOT NULL DEFAULT 1,
-                    cron_expr TEXT NOT NULL,
-                    user_list_json TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    last_run_at TEXT,
-                    last_task_id TEXT,
-                    next_run_at TEXT
+                "CREATE INDEX IF NOT EXISTS idx_schedules_created_at "
+                "ON schedules(created_at DESC)"
+            )
+
+    @staticmethod
+    def _migrate_iso_columns(
+        conn: sqlite3.Connection,
+        tables: set[str],
+        columns: dict[str, str],
+    ) -> None:
+        """旧版本以 ISO 字符串存储时间列，重建为 UTC 微秒整数列。
+
+        不带时区的旧时间与旧版本读取时一致，按 UTC 处理。
+        若上次迁移中断留下了 schedules_legacy 表，则继续把其中的行补入新表后再删除。
+        """
+        conn.execute("DROP INDEX IF EXISTS idx_schedules_created_at")
+        if columns.get("created_at", "").upper() == "TEXT":
+            if "schedules_legacy" in tables:
+                # 两张旧表并存时先并入 schedules_legacy，已有的行以 schedules_legacy 为准
+                conn.execute(
+                    f"INSERT OR IGNORE INTO schedules_legacy ({_COLUMNS_SQL}) "
+                    f"SELECT {_COLUMNS_SQL} FROM schedules"
+                )
+                conn.execute("DROP TABLE schedules")
+            else:
+                conn.execute("ALTER TABLE schedules RENAME TO schedules_legacy")
+        conn.execute(_CREATE_TABLE_SQL)
+
+        now_us = _to_us(datetime.now(_UTC))
+        params = []
+        legacy_rows = conn.execute(f"SELECT {_COLUMNS_SQL} FROM schedules_legacy").fetchall()
+        for row in legacy_rows:
+            try:
+                created_at, updated_at, last_run_at, next_run_at = (
+                    _to_us(_from_iso(row[5])),
+                    _to_us(_from_iso(row[6])),
+                    _to_us(_from_iso(row[7])),
+                    _to_us(_from_iso(row[9])),
+                )
+            except (TypeError, ValueError):
+                LOGGER.warning("reset invalid timestamps of schedule row: %s", row[0])
+                created_at = updated_at = now_us
+                last_run_at = next_run_at = None
+            params.append(
+                (
+                    *row[:5],
+                    created_at or now_us,
+                    updated_at or now_us,
+                    last_run_at,
+                    row[8],
+                    next_run_at,
                 )
-                """
             )
-            conn.commit()
+        conn.executemany(_INSERT_MISSING_SQL, params)
+        conn.execute("DROP TABLE schedules_legacy")
 
     def _sync_load_all(self) -> list[ScheduleRecord]:
-        with self._connect() as conn:
-            rows = conn.execute(
-                """
-                SELECT
-                    schedule_id,
-                    name,
-                    enabled,
-                    cron_expr,
-                    user_list_json,
-                    created_at,
-                    updated_at,
-                    last_run_at,
-                    last_task_id,
-                    next_run_at
-                FROM schedules
-                ORDER BY created_at DESC
-                """
-            ).fetchall()
+        rows = self._connect().execute(_LOAD_SQL).fetchall()
 
         records: list[ScheduleRecord] = []
         for row in rows:
             try:
-                user_list_raw = json.loads(row[4])
-                user_list = [UserTarget.model_validate(item) for item in user_list_raw]
+                user_list_raw = orjson.loads(row[4])
+                user_list = [_user_from_dict(item) for item in user_list_raw]
 
                 records.append(
                     ScheduleRecord(
@@ -146,11 +318,11 @@ class ScheduleStore:
                         enabled=bool(row[2]),
                         cron_expr=row[3],
                         user_list=user_list,
-                        created_at=_from_iso(row[5]) or datetime.now(timezone.utc),
-                        updated_at=_from_iso(row[6]) or datetime.now(timezone.utc),
-                        last_run_at=_from_iso(row[7]),
+                        created_at=_from_us(row[5]) or datetime.now(timezone.utc),
+                        updated_at=_from_us(row[6]) or datetime.now(timezone.utc),
+                        last_run_at=_from_us(row[7]),
                         last_task_id=row[8],
-                        next_run_at=_from_iso(row[9]),
+                        next_run_at=_from_us(row[9]),
                     )
                 )
             except Exception:
@@ -159,53 +331,31 @@ class ScheduleStore:
         return records
 
     def _sync_upsert(self, record: ScheduleRecord) -> None:
-        user_list_json = json.dumps(
-            [item.model_dump(mode="json") for item in record.user_list],
-            ensure_ascii=False,
-        )
+        self._sync_upsert_many([record])
 
-        with self._connect() as conn:
-            conn.execute(
-                """
-                INSERT INTO schedules (
-                    schedule_id,
-                    name,
-                    enabled,
-                    cron_expr,
-                    user_list_json,
-                    created_at,
-                    updated_at,
-                    last_run_at,
-                    last_task_id,
-                    next_run_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(schedule_id) DO UPDATE SET
-                    name=excluded.name,
-                    enabled=excluded.enabled,
-                    cron_expr=excluded.cron_expr,
-                    user_list_json=excluded.user_list_json,
-                    updated_at=excluded.updated_at,
-                    last_run_at=excluded.last_run_at,
-                    last_task_id=excluded.last_task_id,
-                    next_run_at=excluded.next_run_at
-                """,
-                (
-                    record.schedule_id,
-                    record.name,
-                    int(record.enabled),
-                    record.cron_expr,
-                    user_list_json,
-                    _to_iso(record.created_at),
-                    _to_iso(record.updated_at),
-                    _to_iso(record.last_run_at),
-                    record.last_task_id,
-                    _to_iso(record.next_run_at),
-                ),
-            )
-            conn.commit()
+    def _sync_upsert_many(self, records: list[ScheduleRecord]) -> None:
+        # 先编码全部参数，再在同一事务内 executemany 写入，只提交一次
+        params = [self._row_params(record) for record in records]
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT_SQL, params)
+
+    @staticmethod
+    def _row_params(record: ScheduleRecord) -> tuple[object, ...]:
+        # 由 TypeAdapter 一次性序列化为 JSON 字节并以 BLOB 存储；旧版本写入的 TEXT 行 orjson 同样可读
+        user_list_json = USER_LIST_ADAPTER.dump_json(record.user_list)
+        return (
+            record.schedule_id,
+            record.name,
+            int(record.enabled),
+            record.cron_expr,
+            user_list_json,
+            _to_us(record.created_at),
+            _to_us(record.updated_at),
+            _to_us(record.last_run_at),
+            record.last_task_id,
+            _to_us(record.next_run_at),
+        )
 
     def _sync_delete(self, schedule_id: str) -> None:
-        with self._connect() as conn:
-            conn.execute("DELETE FROM schedules WHERE schedule_id = ?", (schedule_id,))
-            conn.commit()
+        with self._transaction() as conn:
+            conn.execute(_DELETE_SQL, (schedule_id,))
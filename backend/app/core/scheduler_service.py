@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from croniter import croniter
 
@@ -14,7 +15,9 @@ from app.models import ScheduleSummary, UserTarget
 
 LOGGER = logging.getLogger(__name__)
 
-CHECK_INTERVAL_SECONDS = 30
+# 堆为空时的最长休眠时间，执行失败的计划按 RETRY_DELAY_SECONDS 重试
+MAX_IDLE_SECONDS = 300
+RETRY_DELAY_SECONDS = 30
 
 
 class SchedulerService:
@@ -30,17 +33,29 @@ class SchedulerService:
         self._schedules: dict[str, ScheduleRecord] = {}
         self._lock = asyncio.Lock()
         self._ticker: asyncio.Task[None] | None = None
+        self._cron_cache: dict[str, tuple[str, croniter]] = {}
+        # (唤醒时间, schedule_id) 最小堆；条目可能过期，出堆时以 record 当前状态为准
+        self._heap: list[tuple[datetime, str]] = []
+        self._wakeup = asyncio.Event()
 
     async def startup(self) -> None:
+        self._heap = []
+        self._wakeup = asyncio.Event()
         await self._store.ensure()
         records = await self._store.load_all()
 
+        refreshed: list[ScheduleRecord] = []
         async with self._lock:
             for record in records:
                 if record.enabled:
-                    record.next_run_at = self._calc_next_run(record.cron_expr)
-                    await self._store.upsert(record)
+                    record.next_run_at = self._calc_next_run(
+                        record.schedule_id, record.cron_expr
+                    )
+                    refreshed.append(record)
                 self._schedules[record.schedule_id] = record
+                self._push_wakeup(record)
+
+        await self._store.upsert_many(refreshed)
 
         self._ticker = asyncio.create_task(self._tick_loop(), name="scheduler-tick")
 
@@ -52,6 +67,7 @@ class SchedulerService:
             except asyncio.CancelledError:
                 pass
             self._ticker = None
+        await self._store.close()
 
     async def list_schedules(self) -> list[ScheduleSummary]:
         async with self._lock:
@@ -73,20 +89,22 @@ class SchedulerService:
         self._validate_cron(cron_expr)
 
         now = datetime.now(timezone.utc)
+        schedule_id = uuid.uuid4().hex
         record = ScheduleRecord(
-            schedule_id=uuid.uuid4().hex,
+            schedule_id=schedule_id,
             name=name,
             enabled=enabled,
             cron_expr=cron_expr,
             user_list=user_list,
             created_at=now,
             updated_at=now,
-            next_run_at=self._calc_next_run(cron_expr) if enabled else None,
+            next_run_at=self._calc_next_run(schedule_id, cron_expr) if enabled else None,
         )
 
         await self._store.upsert(record)
         async with self._lock:
             self._schedules[record.schedule_id] = record
+            self._push_wakeup(record)
 
         return self._to_summary(record)
 
@@ -114,11 +132,12 @@ class SchedulerService:
             record.enabled = enabled
 
         if record.enabled:
-            record.next_run_at = self._calc_next_run(record.cron_expr)
+            record.next_run_at = self._calc_next_run(record.schedule_id, record.cron_expr)
         else:
             record.next_run_at = None
 
         record.updated_at = datetime.now(timezone.utc)
+        self._push_wakeup(record)
         await self._store.upsert(record)
         return self._to_summary(record)
 
@@ -126,6 +145,7 @@ class SchedulerService:
         await self._get_record(schedule_id)
         async with self._lock:
             self._schedules.pop(schedule_id, None)
+        self._cron_cache.pop(schedule_id, None)
         await self._store.delete(schedule_id)
 
     async def toggle_schedule(self, schedule_id: str) -> ScheduleSummary:
@@ -133,11 +153,12 @@ class SchedulerService:
         record.enabled = not record.enabled
 
         if record.enabled:
-            record.next_run_at = self._calc_next_run(record.cron_expr)
+            record.next_run_at = self._calc_next_run(record.schedule_id, record.cron_expr)
         else:
             record.next_run_at = None
 
         record.updated_at = datetime.now(timezone.utc)
+        self._push_wakeup(record)
         await self._store.upsert(record)
         return self._to_summary(record)
 
@@ -153,10 +174,28 @@ class SchedulerService:
             raise KeyError(schedule_id)
         return record
 
+    def _push_wakeup(self, record: ScheduleRecord, at: datetime | None = None) -> None:
+        wake_at = at or record.next_run_at
+        if not record.enabled or wake_at is None:
+            return
+        heapq.heappush(self._heap, (wake_at, record.schedule_id))
+        self._wakeup.set()
+
+    def _seconds_until_next_wakeup(self) -> float:
+        if not self._heap:
+            return MAX_IDLE_SECONDS
+        delay = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+        return min(MAX_IDLE_SECONDS, max(0.0, delay))
+
     async def _tick_loop(self) -> None:
         while True:
             try:
-                await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+                self._wakeup.clear()
+                timeout = self._seconds_until_next_wakeup()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
                 await self._check_due_schedules()
             except asyncio.CancelledError:
                 break
@@ -167,19 +206,37 @@ class SchedulerService:
         now = datetime.now(timezone.utc)
 
         async with self._lock:
+            due_ids: set[str] = set()
+            while self._heap and self._heap[0][0] <= now:
+                due_ids.add(heapq.heappop(self._heap)[1])
+
             due_records = [
                 r
-                for r in self._schedules.values()
-                if r.enabled and r.next_run_at and r.next_run_at <= now
+                for schedule_id in due_ids
+                if (r := self._schedules.get(schedule_id)) is not None
+                and r.enabled
+                and r.next_run_at
+                and r.next_run_at <= now
             ]
 
         for record in due_records:
             try:
                 await self._execute_schedule(record)
-                record.next_run_at = self._calc_next_run(record.cron_expr)
+                async with self._lock:
+                    # 执行期间计划可能已被修改或停用，此时以最新状态为准
+                    if not record.enabled or self._schedules.get(record.schedule_id) is not record:
+                        continue
+                    record.next_run_at = self._calc_next_run(
+                        record.schedule_id, record.cron_expr
+                    )
+                    self._push_wakeup(record)
                 await self._store.upsert(record)
             except Exception:
                 LOGGER.exception("failed to execute schedule: %s", record.schedule_id)
+                self._push_wakeup(
+                    record,
+                    at=datetime.now(timezone.utc) + timedelta(seconds=RETRY_DELAY_SECONDS),
+                )
 
     async def _execute_schedule(self, record: ScheduleRecord) -> str:
         settings = await self._settings_store.load()
@@ -206,10 +263,16 @@ class SchedulerService:
         if not croniter.is_valid(cron_expr):
             raise ValueError(f"无效的 Cron 表达式: {cron_expr}")
 
-    @staticmethod
-    def _calc_next_run(cron_expr: str) -> datetime:
+    def _calc_next_run(self, schedule_id: str, cron_expr: str) -> datetime:
         now = datetime.now(timezone.utc)
-        cron = croniter(cron_expr, now)
+        # 复用已解析的 croniter，表达式变化时才重新解析
+        cached = self._cron_cache.get(schedule_id)
+        if cached is not None and cached[0] == cron_expr:
+            cron = cached[1]
+            cron.set_current(now, force=True)
+        else:
+            cron = croniter(cron_expr, now)
+            self._cron_cache[schedule_id] = (cron_expr, cron)
         next_dt = cron.get_next(datetime)
         if next_dt.tzinfo is None:
             next_dt = next_dt.replace(tzinfo=timezone.utc)
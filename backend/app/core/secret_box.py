@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import base64
+import binascii
 import os
+from functools import lru_cache
 from pathlib import Path
 
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 
-ENCRYPTED_PREFIX = "enc:v1:"
+ENCRYPTED_PREFIX = "enc:v2:"
+LEGACY_ENCRYPTED_PREFIX = "enc:v1:"
+_ENCRYPTED_PREFIXES = (ENCRYPTED_PREFIX, LEGACY_ENCRYPTED_PREFIX)
+_PREFIX_B = ENCRYPTED_PREFIX.encode("ascii")
+_LEGACY_PREFIX_B = LEGACY_ENCRYPTED_PREFIX.encode("ascii")
+_ENCRYPTED_PREFIXES_B = (_PREFIX_B, _LEGACY_PREFIX_B)
+_NONCE_SIZE = 12
+_AESGCM_KEY_INFO = b"f2-web-app secretbox aes-256-gcm"
 
 
 class SecretBox:
@@ -13,50 +27,106 @@ class SecretBox:
         self._key_file = Path(key_file)
         self._env_key = env_key
         self._fernet: Fernet | None = None
+        self._aesgcm: AESGCM | None = None
+        self._key: bytes | None = None
 
     def encrypt(self, plain_text: str) -> str:
         if not plain_text:
             return ""
 
-        if plain_text.startswith(ENCRYPTED_PREFIX):
+        if plain_text.startswith(_ENCRYPTED_PREFIXES):
             return plain_text
 
-        token = self._get_fernet().encrypt(plain_text.encode("utf-8")).decode("utf-8")
-        return f"{ENCRYPTED_PREFIX}{token}"
+        return self.encrypt_bytes(plain_text.encode("utf-8")).decode("ascii")
 
     def decrypt(self, cipher_text: str) -> str:
         if not cipher_text:
             return ""
 
-        if not cipher_text.startswith(ENCRYPTED_PREFIX):
+        if not cipher_text.startswith(_ENCRYPTED_PREFIXES):
             return cipher_text
 
-        token = cipher_text[len(ENCRYPTED_PREFIX) :]
+        return self.decrypt_bytes(cipher_text.encode("utf-8")).decode("utf-8")
+
+    def encrypt_bytes(self, plain: bytes) -> bytes:
+        """bytes 版本的 encrypt，返回带 enc:v2: 前缀的 ASCII 字节。"""
+        if not plain:
+            return b""
+
+        if plain.startswith(_ENCRYPTED_PREFIXES_B):
+            return plain
+
+        nonce = os.urandom(_NONCE_SIZE)
+        sealed = self._get_aesgcm().encrypt(nonce, plain, None)
+        return _PREFIX_B + base64.urlsafe_b64encode(nonce + sealed)
+
+    def decrypt_bytes(self, cipher: bytes) -> bytes:
+        """bytes 版本的 decrypt；不带加密前缀的输入原样返回。"""
+        if not cipher:
+            return b""
+
+        if cipher.startswith(_PREFIX_B):
+            try:
+                raw = base64.urlsafe_b64decode(cipher[len(_PREFIX_B) :])
+                return self._get_aesgcm().decrypt(raw[:_NONCE_SIZE], raw[_NONCE_SIZE:], None)
+            except (InvalidTag, binascii.Error, ValueError) as exc:
+                raise ValueError("Cookie 解密失败，请检查加密密钥配置") from exc
+
+        if not cipher.startswith(_LEGACY_PREFIX_B):
+            return cipher
+
+        # 兼容旧版本 Fernet 密文，下次保存设置时会以 v2 格式重新加密
         try:
-            plain = self._get_fernet().decrypt(token.encode("utf-8"))
-            return plain.decode("utf-8")
+            return self._get_fernet().decrypt(cipher[len(_LEGACY_PREFIX_B) :])
         except InvalidToken as exc:
             raise ValueError("Cookie 解密失败，请检查加密密钥配置") from exc
 
+    def _get_aesgcm(self) -> AESGCM:
+        if self._aesgcm is not None:
+            return self._aesgcm
+
+        # 沿用原有的 Fernet 密钥配置，经 HKDF 派生出独立的 AES-256 密钥
+        key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=_AESGCM_KEY_INFO,
+        ).derive(base64.urlsafe_b64decode(self._load_key()))
+        self._aesgcm = AESGCM(key)
+        return self._aesgcm
+
     def _get_fernet(self) -> Fernet:
         if self._fernet is not None:
             return self._fernet
 
+        self._fernet = Fernet(self._load_key())
+        return self._fernet
+
+    def _load_key(self) -> bytes:
+        # Fernet 与 AES-GCM 共用同一份密钥材料，只读取一次
+        if self._key is not None:
+            return self._key
+
         key_text = os.getenv(self._env_key, "").strip()
         if key_text:
-            key = key_text.encode("utf-8")
+            self._key = key_text.encode("utf-8")
         else:
-            key = self._load_or_create_file_key()
-        self._fernet = Fernet(key)
-        return self._fernet
+            self._key = self._load_or_create_file_key()
+        return self._key
 
     def _load_or_create_file_key(self) -> bytes:
         self._key_file.parent.mkdir(parents=True, exist_ok=True)
         if self._key_file.exists():
-            return self._key_file.read_text(encoding="utf-8").strip().encode("utf-8")
+            return self._key_file.read_bytes().strip()
 
         key = Fernet.generate_key()
         tmp = self._key_file.with_suffix(self._key_file.suffix + ".tmp")
         tmp.write_text(key.decode("utf-8"), encoding="utf-8")
         tmp.replace(self._key_file)
         return key
+
+
+@lru_cache(maxsize=1)
+def get_secret_box(key_file: str, env_key: str = "SETTINGS_ENCRYPTION_KEY") -> SecretBox:
+    """按密钥文件路径复用 SecretBox，同一进程内只派生一次密钥。"""
+    return SecretBox(key_file, env_key=env_key)
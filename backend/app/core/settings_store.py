@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import os
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from app.core.secret_box import SecretBox
+import orjson
+
+from app.core.secret_box import ENCRYPTED_PREFIX, get_secret_box
 from app.models import DownloaderSettings
 
 
@@ -18,8 +22,12 @@ class SettingsStore:
         self._path = Path(settings_file)
         default_secret_file = self._path.parent / "settings.secret.key"
         resolved_secret_file = os.getenv("SETTINGS_SECRET_FILE") or secret_key_file
-        self._secret_box = SecretBox(resolved_secret_file or default_secret_file)
+        self._secret_box = get_secret_box(str(resolved_secret_file or default_secret_file))
+        # 读写仍由 _lock 保证原子性（atomic() 跨越读-改-写），文件 I/O 固定在单个专用线程
         self._lock = asyncio.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="settings-io")
+        # 最近一次读写的 (明文, 密文)，cookie 未变化时复用密文，避免每次保存都重新加密
+        self._cookie_cipher: tuple[str, str] | None = None
 
     async def ensure(self) -> DownloaderSettings:
         async with self._lock:
@@ -44,28 +52,66 @@ class SettingsStore:
             await self._write(settings)
             return settings
 
+    @asynccontextmanager
+    async def atomic(self) -> AsyncIterator[DownloaderSettings]:
+        """在同一次加锁内读取并修改设置，退出时仅在字段有变化时写回一次。"""
+        async with self._lock:
+            if not self._path.exists():
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                settings = DownloaderSettings()
+                original = None
+            else:
+                settings = await self._read()
+                original = settings.model_copy()
+
+            yield settings
+
+            if original is None or settings != original:
+                await self._write(settings)
+
     async def _read(self) -> DownloaderSettings:
         def _sync_read() -> DownloaderSettings:
-            raw = json.loads(self._path.read_text(encoding="utf-8"))
+            raw = orjson.loads(self._path.read_bytes())
             cookie = raw.get("douyin_cookie")
             if isinstance(cookie, str):
-                raw["douyin_cookie"] = self._secret_box.decrypt(cookie)
+                plain = self._secret_box.decrypt(cookie)
+                raw["douyin_cookie"] = plain
+                self._remember_cookie(plain, cookie)
             return DownloaderSettings.model_validate(raw)
 
-        return await asyncio.to_thread(_sync_read)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, _sync_read)
 
     async def _write(self, settings: DownloaderSettings) -> None:
         payload = settings.model_dump(mode="json")
         cookie = payload.get("douyin_cookie")
         if isinstance(cookie, str) and cookie:
-            payload["douyin_cookie"] = self._secret_box.encrypt(cookie)
+            cached = self._cookie_cipher
+            if cached is not None and cached[0] == cookie:
+                payload["douyin_cookie"] = cached[1]
+            else:
+                cipher = self._secret_box.encrypt(cookie)
+                payload["douyin_cookie"] = cipher
+                self._remember_cookie(cookie, cipher)
 
         def _sync_write() -> None:
+            data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
             tmp = self._path.with_suffix(self._path.suffix + ".tmp")
-            tmp.write_text(
-                json.dumps(payload, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
-            tmp.replace(self._path)
+            # fsync 后再替换，避免掉电时留下空文件或半截内容
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view) :]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp, self._path)
+
+        await asyncio.get_running_loop().run_in_executor(self._executor, _sync_write)
 
-        await asyncio.to_thread(_sync_write)
+    def _remember_cookie(self, plain: str, cipher: str) -> None:
+        # 只缓存当前格式的密文，旧格式密文仍会在下次保存时重新加密
+        if plain and cipher.startswith(ENCRYPTED_PREFIX):
+            self._cookie_cipher = (plain, cipher)
+        else:
+            self._cookie_cipher = None
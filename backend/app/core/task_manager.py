@@ -6,9 +6,8 @@ import uuid
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from app.core.crawler_service import DouyinCrawlerService
 from app.core.task_store import StoredTask, TaskStore
 from app.models import (
     DownloaderSettings,
@@ -21,6 +20,9 @@ from app.models import (
     UserTarget,
 )
 
+if TYPE_CHECKING:
+    from app.core.crawler_service import DouyinCrawlerService
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -36,12 +38,15 @@ class TaskRecord:
     error: str | None = None
     result: TaskResult | None = None
     logs: deque[LogEntry] = field(default_factory=lambda: deque(maxlen=2000))
+    log_seq: int = 0
     subscribers: set[asyncio.Queue[TaskEvent]] = field(default_factory=set)
     cancel_event: asyncio.Event = field(default_factory=asyncio.Event)
     worker: asyncio.Task[None] | None = None
     persist_dirty: bool = False
     persist_urgent: bool = False
     persist_worker: asyncio.Task[None] | None = None
+    # 持久化用的设置副本（Cookie 已清空），首次持久化时生成，之后复用同一对象
+    stored_settings: DownloaderSettings | None = None
 
 
 class TaskManager:
@@ -81,6 +86,7 @@ class TaskManager:
 
         for item in stored_tasks:
             logs = deque(item.logs, maxlen=self._max_logs)
+            log_seq = item.log_seq
             status = item.status
             error = item.error
             ended_at = item.ended_at
@@ -91,6 +97,7 @@ class TaskManager:
                 ended_at = ended_at or now
                 resume_message = "服务重启，未完成任务已标记为取消"
                 logs.append(LogEntry(timestamp=now, level="warning", message=resume_message))
+                log_seq += 1
                 error = error or resume_message
 
             record = TaskRecord(
@@ -104,6 +111,7 @@ class TaskManager:
                 error=error,
                 result=item.result,
                 logs=logs,
+                log_seq=log_seq,
             )
             restored[record.task_id] = record
 
@@ -127,6 +135,8 @@ class TaskManager:
         if workers:
             await asyncio.gather(*workers, return_exceptions=True)
 
+        await self._task_store.close()
+
     async def create_task(
         self,
         settings: DownloaderSettings,
@@ -321,6 +331,7 @@ class TaskManager:
             if not level:
                 level = "error" if event_type.endswith("failed") else "info"
             record.logs.append(LogEntry(timestamp=now, level=level, message=message))
+            record.log_seq += 1
 
         for queue in record.subscribers:
             try:
@@ -380,8 +391,14 @@ class TaskManager:
             await self._task_store.upsert(stored)
 
     def _to_stored(self, record: TaskRecord) -> StoredTask:
-        settings_snapshot = record.settings.model_copy(deep=True)
-        settings_snapshot.douyin_cookie = ""
+        # StoredTask 不携带 Cookie：每条记录只生成一次清空 Cookie 的副本。
+        # TaskStore 按对象身份缓存已编码的 settings/user_list JSON，因此这里必须每次传入同一对象；
+        # record.settings 与 record.user_list 在任务创建后不再被替换或修改
+        stored_settings = record.stored_settings
+        if stored_settings is None:
+            stored_settings = record.settings.model_copy(update={"douyin_cookie": ""})
+            record.stored_settings = stored_settings
+
         logs = list(record.logs)
         if len(logs) > self._persisted_logs_max:
             logs = logs[-self._persisted_logs_max :]
@@ -393,10 +410,11 @@ class TaskManager:
             started_at=record.started_at,
             ended_at=record.ended_at,
             error=record.error,
-            settings=settings_snapshot,
+            settings=stored_settings,
             user_list=record.user_list,
             result=record.result,
             logs=logs,
+            log_seq=record.log_seq,
         )
 
     @staticmethod
@@ -1,16 +1,86 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import sqlite3
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 
-from app.models import DownloaderSettings, LogEntry, TaskResult, TaskStatus, UserTarget
+import orjson
+
+from app.models import (
+    USER_LIST_ADAPTER,
+    DownloaderSettings,
+    LogEntry,
+    TaskResult,
+    TaskStatus,
+    UserTarget,
+)
 
 LOGGER = logging.getLogger(__name__)
+_UTC = timezone.utc
+# 等价于 PRAGMA busy_timeout=5000：其他进程持有写锁时等待而不是立即报 database is locked
+_BUSY_TIMEOUT_SECONDS = 5.0
+
+# SQL 文本固定为模块常量，配合长连接命中 sqlite3 的语句缓存
+_LOAD_SQL = """
+SELECT
+    task_id,
+    status,
+    created_at,
+    started_at,
+    ended_at,
+    error,
+    settings_json,
+    user_list_json,
+    result_json,
+    logs_json
+FROM tasks
+ORDER BY created_at DESC
+LIMIT ?
+"""
+_LOAD_LOGS_SQL = "SELECT task_id, seq, entry_json FROM task_logs ORDER BY task_id, seq"
+_UPSERT_SQL = """
+INSERT INTO tasks (
+    task_id,
+    status,
+    created_at,
+    started_at,
+    ended_at,
+    error,
+    settings_json,
+    user_list_json,
+    result_json,
+    logs_json,
+    updated_at
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(task_id) DO UPDATE SET
+    status=excluded.status,
+    created_at=excluded.created_at,
+    started_at=excluded.started_at,
+    ended_at=excluded.ended_at,
+    error=excluded.error,
+    settings_json=excluded.settings_json,
+    user_list_json=excluded.user_list_json,
+    result_json=excluded.result_json,
+    logs_json=excluded.logs_json,
+    updated_at=excluded.updated_at
+"""
+_INSERT_LOGS_SQL = "INSERT OR REPLACE INTO task_logs (task_id, seq, entry_json) VALUES (?, ?, ?)"
+_TRIM_LOGS_SQL = "DELETE FROM task_logs WHERE task_id = ? AND seq < ?"
+_COUNT_SQL = "SELECT COUNT(*) FROM tasks"
+_TASK_IDS_SQL = "SELECT task_id FROM tasks"
+_PRUNE_SQL = """
+DELETE FROM tasks
+WHERE task_id IN (
+    SELECT task_id FROM tasks ORDER BY created_at ASC LIMIT ?
+)
+"""
+_PRUNE_LOGS_SQL = "DELETE FROM task_logs WHERE task_id NOT IN (SELECT task_id FROM tasks)"
 
 
 @dataclass(slots=True)
@@ -25,6 +95,8 @@ class StoredTask:
     user_list: list[UserTarget]
     result: TaskResult | None
     logs: list[LogEntry]
+    # 该任务累计产生的日志条数；logs 为其中最新的一段，首条序号为 log_seq - len(logs)
+    log_seq: int = 0
 
 
 def _to_iso(value: datetime | None) -> str | None:
@@ -36,38 +108,92 @@ def _from_iso(value: str | None) -> datetime | None:
         return None
 
     dt = datetime.fromisoformat(value)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt
+    return dt if dt.tzinfo else dt.replace(tzinfo=_UTC)
+
+
+def _dumps(value: object) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _log_from_dict(item: dict) -> LogEntry:
+    # 日志由本模块写入，结构可信，跳过 pydantic 校验
+    return LogEntry.model_construct(
+        timestamp=_from_iso(item["timestamp"]),
+        level=item.get("level", "info"),
+        message=item["message"],
+    )
 
 
 class TaskStore:
     def __init__(self, db_file: str | Path, max_tasks: int = 200) -> None:
         self._path = Path(db_file)
         self._max_tasks = max(1, max_tasks)
-        self._lock = asyncio.Lock()
+        # 只串行化写连接；读取走独立的短连接，WAL 下读写互不阻塞
+        self._write_lock = asyncio.Lock()
+        self._conn: sqlite3.Connection | None = None
+        # task_id -> 已写入 task_logs 的日志序号上界，用于只追加新日志
+        self._persisted_log_seq: dict[str, int] = {}
+        # task_id -> (settings, user_list, settings_json, user_list_json)
+        # 任务创建后 settings/user_list 不再变化，按对象身份复用已编码的 JSON
+        self._static_json: dict[
+            str, tuple[DownloaderSettings, list[UserTarget], str, str]
+        ] = {}
 
     async def ensure(self) -> None:
-        async with self._lock:
+        async with self._write_lock:
             await asyncio.to_thread(self._sync_ensure)
 
     async def load_all(self) -> list[StoredTask]:
-        async with self._lock:
-            return await asyncio.to_thread(self._sync_load_all)
+        tasks, persisted_log_seq = await asyncio.to_thread(self._sync_load_all)
+        async with self._write_lock:
+            self._persisted_log_seq.update(persisted_log_seq)
+        return tasks
 
     async def upsert(self, task: StoredTask) -> None:
-        async with self._lock:
+        async with self._write_lock:
             await asyncio.to_thread(self._sync_upsert, task)
 
+    async def close(self) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._sync_close)
+
     def _connect(self) -> sqlite3.Connection:
+        # 写入长连接：所有访问都经由 self._write_lock 串行化，因此可跨 to_thread 的工作线程复用
+        if self._conn is not None:
+            return self._conn
+
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        conn = sqlite3.connect(self._path)
+        conn = sqlite3.connect(
+            self._path,
+            timeout=_BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False,
+        )
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-20000")
+        self._conn = conn
         return conn
 
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _sync_close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
     def _sync_ensure(self) -> None:
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tasks (
@@ -88,44 +214,51 @@ class TaskStore:
             conn.execute(
                 "CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at DESC)"
             )
-            conn.commit()
-
-    def _sync_load_all(self) -> list[StoredTask]:
-        with self._connect() as conn:
-            rows = conn.execute(
+            conn.execute(
                 """
-                SELECT
-                    task_id,
-                    status,
-                    created_at,
-                    started_at,
-                    ended_at,
-                    error,
-                    settings_json,
-                    user_list_json,
-                    result_json,
-                    logs_json
-                FROM tasks
-                ORDER BY created_at DESC
-                LIMIT ?
-                """,
-                (self._max_tasks,),
-            ).fetchall()
+                CREATE TABLE IF NOT EXISTS task_logs (
+                    task_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    entry_json TEXT NOT NULL,
+                    PRIMARY KEY (task_id, seq)
+                )
+                """
+            )
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, timeout=_BUSY_TIMEOUT_SECONDS)
+
+    def _sync_load_all(self) -> tuple[list[StoredTask], dict[str, int]]:
+        with closing(self._connect_reader()) as conn:
+            rows = conn.execute(_LOAD_SQL, (self._max_tasks,)).fetchall()
+            log_rows_all = conn.execute(_LOAD_LOGS_SQL).fetchall()
+
+        logs_by_task: dict[str, list[tuple[int, str]]] = {}
+        for task_id, seq, entry_json in log_rows_all:
+            logs_by_task.setdefault(task_id, []).append((seq, entry_json))
 
+        persisted_log_seq: dict[str, int] = {}
         tasks: list[StoredTask] = []
         for row in rows:
             try:
-                settings = DownloaderSettings.model_validate(json.loads(row[6]))
+                settings = DownloaderSettings.model_validate(orjson.loads(row[6]))
                 settings.douyin_cookie = ""
-                user_list_raw = json.loads(row[7])
-                user_list = [UserTarget.model_validate(item) for item in user_list_raw]
+                user_list = USER_LIST_ADAPTER.validate_json(row[7])
 
                 result: TaskResult | None = None
                 if row[8]:
-                    result = TaskResult.model_validate(json.loads(row[8]))
+                    result = TaskResult.model_validate(orjson.loads(row[8]))
 
-                logs_raw = json.loads(row[9])
-                logs = [LogEntry.model_validate(item) for item in logs_raw]
+                log_rows = logs_by_task.get(row[0])
+                if log_rows:
+                    logs = [_log_from_dict(orjson.loads(item)) for _, item in log_rows]
+                    log_seq = log_rows[-1][0] + 1
+                    persisted_log_seq[row[0]] = log_seq
+                else:
+                    # 兼容旧版本：日志整体存放在 tasks.logs_json 中
+                    logs_raw = orjson.loads(row[9])
+                    logs = [_log_from_dict(item) for item in logs_raw]
+                    log_seq = len(logs)
 
                 tasks.append(
                     StoredTask(
@@ -139,62 +272,37 @@ class TaskStore:
                         user_list=user_list,
                         result=result,
                         logs=logs,
+                        log_seq=log_seq,
                     )
                 )
             except Exception:
                 LOGGER.exception("skip invalid persisted task row: %s", row[0])
 
-        return tasks
+        return tasks, persisted_log_seq
 
     def _sync_upsert(self, task: StoredTask) -> None:
-        settings_payload = task.settings.model_dump(mode="json")
-        settings_payload["douyin_cookie"] = ""
-        settings_json = json.dumps(settings_payload, ensure_ascii=False)
-        user_list_json = json.dumps(
-            [item.model_dump(mode="json") for item in task.user_list],
-            ensure_ascii=False,
-        )
+        settings_json, user_list_json = self._encode_static(task)
         result_json = (
-            json.dumps(task.result.model_dump(mode="json"), ensure_ascii=False)
-            if task.result is not None
-            else None
-        )
-        logs_json = json.dumps(
-            [item.model_dump(mode="json") for item in task.logs],
-            ensure_ascii=False,
+            _dumps(task.result.model_dump(mode="json")) if task.result is not None else None
         )
 
+        # 日志按序号增量写入 task_logs，只插入上次持久化之后的新条目
+        first_seq = task.log_seq - len(task.logs)
+        persisted_seq = max(first_seq, self._persisted_log_seq.get(task.task_id, 0))
+        new_logs = [
+            (
+                task.task_id,
+                seq,
+                _dumps(task.logs[seq - first_seq].model_dump(mode="json")),
+            )
+            for seq in range(persisted_seq, task.log_seq)
+        ]
+
         now = datetime.now(timezone.utc).isoformat()
 
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute(
-                """
-                INSERT INTO tasks (
-                    task_id,
-                    status,
-                    created_at,
-                    started_at,
-                    ended_at,
-                    error,
-                    settings_json,
-                    user_list_json,
-                    result_json,
-                    logs_json,
-                    updated_at
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(task_id) DO UPDATE SET
-                    status=excluded.status,
-                    created_at=excluded.created_at,
-                    started_at=excluded.started_at,
-                    ended_at=excluded.ended_at,
-                    error=excluded.error,
-                    settings_json=excluded.settings_json,
-                    user_list_json=excluded.user_list_json,
-                    result_json=excluded.result_json,
-                    logs_json=excluded.logs_json,
-                    updated_at=excluded.updated_at
-                """,
+                _UPSERT_SQL,
                 (
                     task.task_id,
                     task.status,
@@ -205,17 +313,46 @@ class TaskStore:
                     settings_json,
                     user_list_json,
                     result_json,
-                    logs_json,
+                    "[]",
                     now,
                 ),
             )
-            conn.execute(
-                """
-                DELETE FROM tasks
-                WHERE task_id NOT IN (
-                    SELECT task_id FROM tasks ORDER BY created_at DESC LIMIT ?
-                )
-                """,
-                (self._max_tasks,),
-            )
-            conn.commit()
+            if new_logs:
+                conn.executemany(_INSERT_LOGS_SQL, new_logs)
+            conn.execute(_TRIM_LOGS_SQL, (task.task_id, first_seq))
+            # 仅在超出上限时删除最旧的任务，避免每次写入都做一次反连接扫描
+            overflow = conn.execute(_COUNT_SQL).fetchone()[0] - self._max_tasks
+            if overflow > 0:
+                conn.execute(_PRUNE_SQL, (overflow,))
+                conn.execute(_PRUNE_LOGS_SQL)
+                remaining = {row[0] for row in conn.execute(_TASK_IDS_SQL)}
+                self._persisted_log_seq = {
+                    task_id: seq
+                    for task_id, seq in self._persisted_log_seq.items()
+                    if task_id in remaining
+                }
+                self._static_json = {
+                    task_id: item
+                    for task_id, item in self._static_json.items()
+                    if task_id in remaining
+                }
+
+        self._persisted_log_seq[task.task_id] = task.log_seq
+
+    def _encode_static(self, task: StoredTask) -> tuple[str, str]:
+        # 按对象身份缓存：调用方需保证同一任务的 settings/user_list 对象不被原地修改
+        cached = self._static_json.get(task.task_id)
+        if cached is not None and cached[0] is task.settings and cached[1] is task.user_list:
+            return cached[2], cached[3]
+
+        settings_payload = task.settings.model_dump(mode="json")
+        settings_payload["douyin_cookie"] = ""
+        settings_json = _dumps(settings_payload)
+        user_list_json = USER_LIST_ADAPTER.dump_json(task.user_list).decode("utf-8")
+        self._static_json[task.task_id] = (
+            task.settings,
+            task.user_list,
+            settings_json,
+            user_list_json,
+        )
+        return settings_json, user_list_json
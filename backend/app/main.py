@@ -1,22 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
+import time
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.websockets import WebSocketClose
 
-from app.core.auth_service import AuthService, extract_bearer_token
-from app.core.crawler_service import DouyinCrawlerService
-from app.core.download_path_policy import DownloadPathPolicy
+from app.core.auth_service import AuthService, extract_bearer_bytes
 from app.core.login_rate_limiter import LoginRateLimiter
-from app.core.schedule_store import ScheduleStore
-from app.core.scheduler_service import SchedulerService
-from app.core.settings_store import SettingsStore
-from app.core.task_manager import TaskManager
-from app.core.task_store import TaskStore
 from app.models import (
     AuthPasswordRequest,
     AuthStatus,
@@ -34,6 +34,16 @@ from app.models import (
 )
 
 
+PUBLIC_API_PATHS = frozenset(
+    {
+        "/api/health",
+        "/api/auth/status",
+        "/api/auth/setup",
+        "/api/auth/login",
+    }
+)
+
+
 def _get_app_env() -> str:
     app_env = os.getenv("APP_ENV", "development").strip().lower()
     return app_env if app_env else "development"
@@ -54,41 +64,135 @@ def _env_defaults(app_env: str, runtime_root: Path) -> tuple[Path, Path, Path]:
     )
 
 
-def _resolve_writable_file(default_file: Path, fallback_file: Path) -> str:
+def _resolve_writable_file(default_file: str | Path, fallback_file: str | Path) -> str:
+    default_file = os.fspath(default_file)
     try:
-        default_file.parent.mkdir(parents=True, exist_ok=True)
-        return str(default_file)
+        os.makedirs(os.path.dirname(default_file) or ".", exist_ok=True)
+        return default_file
     except OSError:
-        fallback_file.parent.mkdir(parents=True, exist_ok=True)
-        return str(fallback_file)
+        fallback_file = os.fspath(fallback_file)
+        os.makedirs(os.path.dirname(fallback_file) or ".", exist_ok=True)
+        return fallback_file
 
 
-def _resolve_writable_dir(default_dir: Path, fallback_dir: Path) -> str:
+def _resolve_writable_dir(default_dir: str | Path, fallback_dir: str | Path) -> str:
+    default_dir = os.fspath(default_dir)
     try:
-        default_dir.mkdir(parents=True, exist_ok=True)
-        return str(default_dir)
+        os.makedirs(default_dir, exist_ok=True)
+        return default_dir
     except OSError:
-        fallback_dir.mkdir(parents=True, exist_ok=True)
-        return str(fallback_dir)
+        fallback_dir = os.fspath(fallback_dir)
+        os.makedirs(fallback_dir, exist_ok=True)
+        return fallback_dir
 
 
-def _get_client_identity(request: Request) -> str:
-    forwarded_for = request.headers.get("x-forwarded-for", "").strip()
+# 需要按客户端限流的接口，由中间件预先解析客户端标识
+RATE_LIMITED_API_PATHS = frozenset({"/api/auth/setup", "/api/auth/login"})
+
+
+def _client_identity_from_scope(scope: Scope) -> str:
+    forwarded_for = b""
+    real_ip = b""
+    for name, value in scope["headers"]:
+        if name == b"x-forwarded-for":
+            forwarded_for = forwarded_for or value
+        elif name == b"x-real-ip":
+            real_ip = real_ip or value
+
     if forwarded_for:
-        first = forwarded_for.split(",", 1)[0].strip()
+        first = forwarded_for.split(b",", 1)[0].strip()
         if first:
-            return first
+            return first.decode("latin-1")
 
-    real_ip = request.headers.get("x-real-ip", "").strip()
     if real_ip:
-        return real_ip
+        real_ip = real_ip.strip()
+        if real_ip:
+            return real_ip.decode("latin-1")
 
-    if request.client and request.client.host:
-        return request.client.host
+    client = scope.get("client")
+    if client and client[0]:
+        return client[0]
     return "unknown"
 
 
+def _get_client_identity(request: Request) -> str:
+    identity = request.scope.get("state", {}).get("client_identity")
+    return identity or _client_identity_from_scope(request.scope)
+
+
+def _unauthorized_body(detail: str) -> bytes:
+    return json.dumps({"detail": detail}, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class AuthGuardMiddleware:
+    """纯 ASGI 鉴权中间件，直接读取 scope，避免每个请求构造 Request/Response。"""
+
+    _NOT_CONFIGURED_BODY = _unauthorized_body("请先设置访问密码")
+    _UNAUTHORIZED_BODY = _unauthorized_body("未授权，请先登录")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        auth_service: AuthService,
+        public_paths: frozenset[str] = PUBLIC_API_PATHS,
+    ) -> None:
+        self.app = app
+        self.auth_service = auth_service
+        self.public_paths = public_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if path in RATE_LIMITED_API_PATHS and scope["type"] == "http":
+            scope.setdefault("state", {})["client_identity"] = _client_identity_from_scope(scope)
+
+        if (
+            scope["type"] != "http"
+            or path in self.public_paths
+            or not path.startswith("/api")
+            or scope["method"] == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.auth_service.is_configured():
+            await self._reject(send, self._NOT_CONFIGURED_BODY)
+            return
+
+        now = int(time.time())
+        scope.setdefault("state", {})["now"] = now
+        if not await self.auth_service.verify_token(extract_bearer_bytes(scope["headers"]), now):
+            await self._reject(send, self._UNAUTHORIZED_BODY)
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, body: bytes) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
 def create_app() -> FastAPI:
+    # 任务、计划、存储相关模块（含 sqlite3、croniter、爬虫服务）按需在此导入
+    from app.core.crawler_service import DouyinCrawlerService
+    from app.core.download_path_policy import DownloadPathPolicy
+    from app.core.schedule_store import ScheduleStore
+    from app.core.scheduler_service import SchedulerService
+    from app.core.settings_store import SettingsStore
+    from app.core.task_manager import TaskManager
+    from app.core.task_store import TaskStore
+
     app = FastAPI(title="F2", version="0.2.6")
     app.add_middleware(
         CORSMiddleware,
@@ -192,39 +296,11 @@ def create_app() -> FastAPI:
         task_manager=task_manager,
     )
 
-    @app.middleware("http")
-    async def _auth_guard(request: Request, call_next):
-        path = request.url.path
-        if request.method == "OPTIONS":
-            return await call_next(request)
-
-        if not path.startswith("/api"):
-            return await call_next(request)
-
-        public_api_paths = {
-            "/api/health",
-            "/api/auth/status",
-            "/api/auth/setup",
-            "/api/auth/login",
-        }
-        if path in public_api_paths:
-            return await call_next(request)
-
-        configured = await auth_service.is_configured()
-        if not configured:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "请先设置访问密码"},
-            )
-
-        token = extract_bearer_token(request.headers.get("Authorization"))
-        if not await auth_service.verify_token(token):
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "未授权，请先登录"},
-            )
-
-        return await call_next(request)
+    app.add_middleware(
+        AuthGuardMiddleware,
+        auth_service=auth_service,
+        public_paths=PUBLIC_API_PATHS,
+    )
 
     @app.on_event("startup")
     async def _startup() -> None:
@@ -314,9 +390,12 @@ def create_app() -> FastAPI:
     @app.put("/api/settings", response_model=DownloaderSettings)
     async def put_settings(payload: DownloaderSettings) -> DownloaderSettings:
         try:
-            normalized = payload.model_copy(deep=True)
-            normalized.download_path = download_path_policy.ensure_writable(
-                payload.download_path
+            normalized = payload.model_copy(
+                update={
+                    "download_path": download_path_policy.ensure_writable(
+                        payload.download_path
+                    )
+                }
             )
             ensure_time_based_features_support_naming(
                 normalized.naming,
@@ -329,21 +408,19 @@ def create_app() -> FastAPI:
 
     @app.post("/api/tasks", response_model=TaskSummary)
     async def post_task(payload: TaskCreateRequest) -> TaskSummary:
-        settings = await settings_store.load()
-
-        # 优先使用任务级自定义目录，否则使用全局设置
-        raw_download_path = payload.download_path or settings.download_path
-        try:
-            final_download_path = download_path_policy.ensure_writable(
-                raw_download_path
-            )
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        async with settings_store.atomic() as settings:
+            # 优先使用任务级自定义目录，否则使用全局设置
+            raw_download_path = payload.download_path or settings.download_path
+            try:
+                final_download_path = download_path_policy.ensure_writable(
+                    raw_download_path
+                )
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-        # 如果使用全局默认且路径被规范化，同步回设置
-        if not payload.download_path and final_download_path != settings.download_path:
-            settings.download_path = final_download_path
-            await settings_store.save(settings)
+            # 如果使用全局默认且路径被规范化，同步回设置（退出时统一写入）
+            if not payload.download_path and final_download_path != settings.download_path:
+                settings.download_path = final_download_path
 
         task_settings = settings.model_copy(deep=True)
         task_settings.download_path = final_download_path
@@ -461,7 +538,10 @@ def create_app() -> FastAPI:
     @app.websocket("/ws/tasks/{task_id}")
     async def ws_task(websocket: WebSocket, task_id: str) -> None:
         configured = await auth_service.is_configured()
-        token = websocket.query_params.get("token")
+        # 浏览器 WebSocket 无法自定义请求头，未携带 Authorization 时回退到 query 参数
+        token = extract_bearer_bytes(websocket.scope["headers"]) or websocket.query_params.get(
+            "token"
+        )
         authorized = configured and await auth_service.verify_token(token)
 
         await websocket.accept()
@@ -474,12 +554,7 @@ def create_app() -> FastAPI:
         try:
             queue = await task_manager.subscribe(task_id)
             detail = await task_manager.get_task_detail(task_id)
-            await websocket.send_json(
-                {
-                    "type": "snapshot",
-                    "task": detail.model_dump(mode="json"),
-                }
-            )
+            await websocket.send_text(f'{{"type":"snapshot","task":{detail.model_dump_json()}}}')
         except KeyError:
             await websocket.send_json({"type": "error", "message": "任务不存在"})
             await websocket.close(code=1008)
@@ -488,7 +563,19 @@ def create_app() -> FastAPI:
         try:
             while True:
                 event = await queue.get()
-                await websocket.send_json(event.model_dump(mode="json"))
+                # 一次取完队列中已积压的事件，日志密集时合并为一个 batch 帧发送
+                batch = [event]
+                while True:
+                    try:
+                        batch.append(queue.get_nowait())
+                    except asyncio.QueueEmpty:
+                        break
+
+                if len(batch) == 1:
+                    await websocket.send_text(event.to_json_text())
+                else:
+                    events_json = ",".join(item.to_json_text() for item in batch)
+                    await websocket.send_text(f'{{"type":"batch","events":[{events_json}]}}')
         except WebSocketDisconnect:
             pass
         finally:
@@ -499,25 +586,68 @@ def create_app() -> FastAPI:
 
     dist_path = Path(os.getenv("FRONTEND_DIST", "/opt/f2_web/frontend_dist"))
     assets_path = dist_path / "assets"
+    dist_dir = str(dist_path)
+    # 解析符号链接后的前端目录，用于限制兜底路由只能访问该目录内的文件
+    real_dist_dir = os.path.realpath(dist_dir)
 
     if assets_path.exists():
         app.mount("/assets", StaticFiles(directory=str(assets_path)), name="assets")
 
-    @app.get("/{full_path:path}", include_in_schema=False)
-    async def spa_fallback(full_path: str):
-        if full_path.startswith("api") or full_path.startswith("ws"):
-            raise HTTPException(status_code=404, detail="Not Found")
+    # index.html 首次命中后缓存内容与 ETag；文件缺失时不缓存，便于之后再构建前端
+    index_cache: tuple[bytes, str] | None = None
 
-        index_file = dist_path / "index.html"
-        request_file = dist_path / full_path
+    def _load_index() -> tuple[bytes, str] | None:
+        nonlocal index_cache
+        if index_cache is None:
+            try:
+                content = (dist_path / "index.html").read_bytes()
+            except OSError:
+                return None
+            etag = f'"{hashlib.md5(content, usedforsecurity=False).hexdigest()}"'
+            index_cache = (content, etag)
+        return index_cache
+
+    async def spa_fallback(scope: Scope, receive: Receive, send: Send) -> None:
+        """前端路由兜底：纯 ASGI 可调用对象，不经过额外的路由与依赖解析。"""
+        if scope["type"] != "http":
+            await WebSocketClose()(scope, receive, send)
+            return
 
-        if request_file.exists() and request_file.is_file():
-            return FileResponse(request_file)
+        if scope["method"] not in ("GET", "HEAD"):
+            response: Response = JSONResponse(
+                {"detail": "Method Not Allowed"}, status_code=405, headers={"Allow": "GET, HEAD"}
+            )
+            await response(scope, receive, send)
+            return
 
-        if index_file.exists():
-            return FileResponse(index_file)
+        full_path = scope["path"].lstrip("/")
+        if full_path.startswith(("api/", "ws/")) or full_path in ("api", "ws"):
+            await JSONResponse({"detail": "Not Found"}, status_code=404)(scope, receive, send)
+            return
 
-        raise HTTPException(status_code=404, detail="前端资源不存在，请先构建 frontend")
+        if full_path:
+            request_file = os.path.realpath(os.path.join(dist_dir, full_path))
+            if (
+                os.path.commonpath([request_file, real_dist_dir]) == real_dist_dir
+                and os.path.isfile(request_file)
+            ):
+                await FileResponse(request_file)(scope, receive, send)
+                return
+
+        index = _load_index()
+        if index is None:
+            response = JSONResponse({"detail": "前端资源不存在，请先构建 frontend"}, status_code=404)
+        else:
+            content, etag = index
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if Headers(scope=scope).get("if-none-match") == etag:
+                response = Response(status_code=304, headers=headers)
+            else:
+                response = Response(content=content, media_type="text/html", headers=headers)
+        await response(scope, receive, send)
+
+    # 挂载在所有 API 与 WebSocket 路由之后，只兜底未匹配的路径
+    app.mount("/", spa_fallback, name="spa")
 
     return app
 
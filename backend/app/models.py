@@ -1,17 +1,31 @@
 from __future__ import annotations
 
 import os
-import re
 from datetime import datetime
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, PrivateAttr, TypeAdapter, model_validator
 
 
 TaskStatus = Literal["pending", "running", "success", "failed", "cancelled"]
-ALLOWED_NAMING_PATTERN = re.compile(
-    r"^\{(?:nickname|create|aweme_id|desc|uid)\}(?:[_-]\{(?:nickname|create|aweme_id|desc|uid)\})*$"
-)
+ALLOWED_NAMING_FIELDS = frozenset({"nickname", "create", "aweme_id", "desc", "uid"})
+
+
+def _is_allowed_naming(value: str) -> bool:
+    # 等价于正则 ^\{字段\}(?:[_-]\{字段\})*$
+    # 按 "}" 切分逐段校验：首段为 "{字段"，其余段为 "分隔符{字段"，末段为空
+    parts = value.split("}")
+    if len(parts) < 2 or parts[-1]:
+        return False
+
+    for index, part in enumerate(parts[:-1]):
+        if index:
+            if part[:1] not in ("_", "-"):
+                return False
+            part = part[1:]
+        if part[:1] != "{" or part[1:] not in ALLOWED_NAMING_FIELDS:
+            return False
+    return True
 
 
 def ensure_time_based_features_support_naming(
@@ -33,12 +47,33 @@ def ensure_time_based_features_support_naming(
         )
 
 
+_USER_ITEM_KEYS = frozenset({"name", "url"})
+
+
+def _is_normalized_user_item(item: Any) -> bool:
+    if type(item) is not dict or item.keys() != _USER_ITEM_KEYS:
+        return False
+    name = item["name"]
+    url = item["url"]
+    return (
+        type(name) is str
+        and type(url) is str
+        and bool(url)
+        and name == name.strip()
+        and url == url.strip()
+    )
+
+
 def normalize_user_list(raw: Any) -> list[dict[str, str]]:
     normalized: list[dict[str, str]] = []
 
     if not isinstance(raw, list):
         return normalized
 
+    # 来自 model_dump 的数据已是规范形式，整体校验通过时直接返回，不再逐项重建
+    if all(_is_normalized_user_item(item) for item in raw):
+        return raw
+
     for item in raw:
         if isinstance(item, str):
             url = item.strip()
@@ -60,6 +95,10 @@ class UserTarget(BaseModel):
     url: str = ""
 
 
+# 整个用户列表共用一个已编译的校验器，一次调用完成批量校验
+USER_LIST_ADAPTER: TypeAdapter[list[UserTarget]] = TypeAdapter(list[UserTarget])
+
+
 class DownloaderSettings(BaseModel):
     user_list: list[UserTarget] = Field(default_factory=list)
     douyin_cookie: str = ""
@@ -115,7 +154,7 @@ class DownloaderSettings(BaseModel):
         if not value:
             raise ValueError("命名模板不能为空")
 
-        if not ALLOWED_NAMING_PATTERN.fullmatch(value):
+        if not _is_allowed_naming(value):
             raise ValueError(
                 "命名模板仅支持 {nickname}/{create}/{aweme_id}/{desc}/{uid}，分隔符仅支持 _ 或 -"
             )
@@ -173,6 +212,14 @@ class TaskEvent(BaseModel):
     message: str = ""
     data: dict[str, Any] = Field(default_factory=dict)
 
+    _json_text: str | None = PrivateAttr(default=None)
+
+    def to_json_text(self) -> str:
+        # 同一事件会推送给所有订阅者，序列化结果只计算一次
+        if self._json_text is None:
+            self._json_text = self.model_dump_json()
+        return self._json_text
+
 
 class UserStat(BaseModel):
     nickname: str
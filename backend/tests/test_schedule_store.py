@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.schedule_store import _CREATE_TABLE_SQL, ScheduleStore
+
+# 旧版本 ScheduleStore 建表语句：时间列以 ISO 字符串存储
+BASELINE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS schedules (
+    schedule_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 1,
+    cron_expr TEXT NOT NULL,
+    user_list_json TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    last_run_at TEXT,
+    last_task_id TEXT,
+    next_run_at TEXT
+)
+"""
+INSERT_SQL = "INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+USER_LIST_JSON = '[{"name": "n", "url": "https://www.douyin.com/user/abc"}]'
+
+
+def _legacy_row(schedule_id: str, created_at: str) -> tuple[object, ...]:
+    return (
+        schedule_id,
+        f"schedule {schedule_id}",
+        1,
+        "*/5 * * * *",
+        USER_LIST_JSON,
+        created_at,
+        created_at,
+        None,
+        None,
+        "2024-05-01T08:05:00+00:00",
+    )
+
+
+class ScheduleStoreMigrationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_file = Path(self._tmp.name) / "schedules.db"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _create_baseline_db(self, table: str, rows: list[tuple[object, ...]]) -> None:
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute(BASELINE_SCHEMA_SQL.replace("schedules", table, 1))
+            conn.executemany(INSERT_SQL.format(table=table), rows)
+        conn.close()
+
+    def _load(self) -> dict[str, object]:
+        async def _run() -> dict[str, object]:
+            store = ScheduleStore(self.db_file)
+            try:
+                await store.ensure()
+                return {record.schedule_id: record for record in await store.load_all()}
+            finally:
+                await store.close()
+
+        return asyncio.run(_run())
+
+    def _table_names(self) -> set[str]:
+        with sqlite3.connect(self.db_file) as conn:
+            names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        conn.close()
+        return names
+
+    def _column_types(self) -> dict[str, str]:
+        with sqlite3.connect(self.db_file) as conn:
+            types = {row[1]: row[2] for row in conn.execute("PRAGMA table_info(schedules)")}
+        conn.close()
+        return types
+
+    def test_migrates_baseline_schema(self) -> None:
+        self._create_baseline_db(
+            "schedules",
+            [
+                _legacy_row("aware", "2024-05-01T08:00:00.123456+08:00"),
+                _legacy_row("naive", "2024-05-01T08:00:00"),
+                _legacy_row("broken", "not-a-date"),
+            ],
+        )
+
+        records = self._load()
+
+        self.assertEqual(self._column_types()["created_at"], "INTEGER")
+        self.assertNotIn("schedules_legacy", self._table_names())
+        self.assertIn("idx_schedules_created_at", self._table_names())
+        self.assertEqual(
+            records["aware"].created_at,
+            datetime(2024, 5, 1, 0, 0, 0, 123456, tzinfo=timezone.utc),
+        )
+        # 不带时区的旧时间按 UTC 处理
+        self.assertEqual(records["naive"].created_at, datetime(2024, 5, 1, 8, tzinfo=timezone.utc))
+        self.assertEqual(records["naive"].next_run_at, datetime(2024, 5, 1, 8, 5, tzinfo=timezone.utc))
+        self.assertIsNone(records["naive"].last_run_at)
+        self.assertEqual(records["naive"].user_list[0].url, "https://www.douyin.com/user/abc")
+        self.assertIsNone(records["broken"].next_run_at)
+
+        # 再次启动不会重复迁移
+        self.assertEqual(set(self._load()), {"aware", "naive", "broken"})
+
+    def test_resumes_when_legacy_table_is_left_behind(self) -> None:
+        self._create_baseline_db(
+            "schedules_legacy",
+            [
+                _legacy_row("copied", "2024-05-01T08:00:00+00:00"),
+                _legacy_row("missing", "2024-05-02T08:00:00+00:00"),
+            ],
+        )
+        # 中断的迁移：新表已建好，只迁入了部分行，且该行之后又被更新过
+        with sqlite3.connect(self.db_file) as conn:
+            conn.execute(_CREATE_TABLE_SQL)
+            conn.execute(
+                INSERT_SQL.format(table="schedules"),
+                ("copied", "updated", 1, "*/5 * * * *", USER_LIST_JSON, 1, 1, None, None, None),
+            )
+        conn.close()
+
+        records = self._load()
+
+        self.assertNotIn("schedules_legacy", self._table_names())
+        self.assertEqual(set(records), {"copied", "missing"})
+        self.assertEqual(records["copied"].name, "updated")
+        self.assertEqual(records["missing"].created_at, datetime(2024, 5, 2, 8, tzinfo=timezone.utc))
+
+
+if __name__ == "__main__":
+    unittest.main()
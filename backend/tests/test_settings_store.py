@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from cryptography.fernet import Fernet
+
+from app.core.secret_box import ENCRYPTED_PREFIX, LEGACY_ENCRYPTED_PREFIX, get_secret_box
+from app.core.settings_store import SettingsStore
+from app.models import DownloaderSettings
+
+COOKIE = "sessionid=abc123; ttwid=中文值"
+
+
+class SettingsStoreCookieUpgradeTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.settings_file = root / "settings.json"
+        self.key_file = root / "settings.secret.key"
+        self._env = mock.patch.dict(os.environ)
+        self._env.start()
+        os.environ.pop("SETTINGS_ENCRYPTION_KEY", None)
+        os.environ.pop("SETTINGS_SECRET_FILE", None)
+        get_secret_box.cache_clear()
+
+    def tearDown(self) -> None:
+        get_secret_box.cache_clear()
+        self._env.stop()
+        self._tmp.cleanup()
+
+    def test_v1_cookie_is_rewritten_as_v2(self) -> None:
+        # 旧版本写入的设置文件：cookie 为 Fernet 密文，密钥保存在密钥文件中
+        key = Fernet.generate_key()
+        self.key_file.write_bytes(key)
+        legacy_cipher = LEGACY_ENCRYPTED_PREFIX + Fernet(key).encrypt(COOKIE.encode("utf-8")).decode(
+            "ascii"
+        )
+        raw = DownloaderSettings().model_dump(mode="json")
+        raw["douyin_cookie"] = legacy_cipher
+        self.settings_file.write_text(json.dumps(raw, ensure_ascii=False), encoding="utf-8")
+
+        async def _round_trip() -> DownloaderSettings:
+            store = SettingsStore(self.settings_file)
+            settings = await store.load()
+            self.assertEqual(settings.douyin_cookie, COOKIE)
+            return await store.save(settings)
+
+        asyncio.run(_round_trip())
+
+        stored_cookie = json.loads(self.settings_file.read_text(encoding="utf-8"))["douyin_cookie"]
+        self.assertTrue(stored_cookie.startswith(ENCRYPTED_PREFIX))
+        self.assertEqual(get_secret_box(str(self.key_file)).decrypt(stored_cookie), COOKIE)
+        self.assertEqual(self.key_file.read_bytes(), key)
+
+        # 新实例重新读取 v2 密文，结果不变
+        get_secret_box.cache_clear()
+        reloaded = asyncio.run(SettingsStore(self.settings_file).load())
+        self.assertEqual(reloaded.douyin_cookie, COOKIE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+
+class SpaFallbackTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        dist = root / "web" / "dist"
+        (dist / "assets").mkdir(parents=True)
+        (dist / "index.html").write_text("<html>idx</html>", encoding="utf-8")
+        (dist / "robots.txt").write_text("robots", encoding="utf-8")
+        (root / "secret.txt").write_text("secret", encoding="utf-8")
+
+        self._cwd = os.getcwd()
+        os.chdir(root)
+        self._env = mock.patch.dict(
+            os.environ,
+            {
+                "APP_ENV": "development",
+                "FRONTEND_DIST": str(dist),
+                "SETTINGS_FILE": str(root / "config" / "settings.json"),
+                "STATE_DIR": str(root / "state"),
+                "DOWNLOAD_PATH": str(root / "downloads"),
+                "TASK_DB_FILE": str(root / "state" / "tasks.db"),
+                "AUTH_FILE": str(root / "state" / "auth.json"),
+                "SCHEDULE_DB_FILE": str(root / "state" / "schedules.db"),
+            },
+        )
+        self._env.start()
+
+        from app.main import create_app
+
+        self.client = TestClient(create_app())
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self._env.stop()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_serves_files_inside_dist(self) -> None:
+        self.assertEqual(self.client.get("/robots.txt").text, "robots")
+        self.assertEqual(self.client.get("/some/route").text, "<html>idx</html>")
+
+    def test_encoded_parent_path_does_not_escape_dist(self) -> None:
+        for path in (
+            "/..%2f..%2fsecret.txt",
+            "/%2e%2e/%2e%2e/secret.txt",
+            "/..%2f..%2f..%2f..%2fetc/passwd",
+        ):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, path)
+            self.assertEqual(response.text, "<html>idx</html>", path)
+
+
+if __name__ == "__main__":
+    unittest.main()
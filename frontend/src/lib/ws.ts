@@ -8,7 +8,14 @@ export function connectTaskWs(taskId: string, onEvent: (event: TaskEvent | any)
 
   ws.onmessage = (event) => {
     try {
-      onEvent(JSON.parse(event.data));
+      const payload = JSON.parse(event.data);
+      if (payload?.type === 'batch' && Array.isArray(payload.events)) {
+        for (const item of payload.events) {
+          onEvent(item);
+        }
+        return;
+      }
+      onEvent(payload);
     } catch {
       // ignore malformed message
     }